@@ -1,54 +1,151 @@
 from fastapi import UploadFile, File
 from fastapi.responses import JSONResponse
-from PIL import Image
-import io
+import asyncio
 import json
-import re
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+from typing import AsyncIterator
 
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from app.llm import llm_router, parse_json
+from app.utils.detection_cache import detection_cache
+from app.utils.image_hash import dhash
+from app.utils.image_ingest import UploadTooLargeError, ingest_upload
+from app.utils.local_classifier import (
+    LOCAL_CLASSIFIER_THRESHOLD,
+    get_local_classifier,
+)
+from app.utils.metrics import metrics
+
+DETECT_BATCH_CONCURRENCY = int(os.getenv("DETECT_BATCH_CONCURRENCY", "4"))
+DETECT_BATCH_MAX_IMAGES = int(os.getenv("DETECT_BATCH_MAX_IMAGES", "25"))
+
+DETECT_PROMPT = """
+Identify the appliance in the image: applianceType (Washing Machine,
+Refrigerator, Air Conditioner, TV, Microwave, etc.), brand if visible, and
+your confidence from 0 to 1.
+"""
+
+DETECT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "applianceType": {"type": "string"},
+        "brand": {"type": "string"},
+        "confidence": {"type": "number"}
+    },
+    "required": ["applianceType", "brand", "confidence"]
+}
+# The answer is a few dozen tokens; the rest is room for gemini-2.5-flash's
+# thinking, which this SDK cannot cap separately and counts against the limit.
+DETECT_MAX_OUTPUT_TOKENS = 2048
 
 class DetectController:
 
     @staticmethod
-    async def detect_appliance(image: UploadFile = File(...)):
-        try:
-            img_bytes = await image.read()
-            pil_img = Image.open(io.BytesIO(img_bytes))
+    async def detect(image: UploadFile) -> dict:
+        ingested = await ingest_upload(image)
 
-            prompt = """
-You are a vision AI.
+        digest = ingested.content_hash
+        phash = dhash(ingested.image)
+        cached = await asyncio.to_thread(
+            detection_cache.lookup, digest, phash
+        )
+        if cached:
+            metrics.increment("detection_tier", "cache")
+            return cached
 
-From the image, identify:
-- applianceType (Washing Machine, Refrigerator, Air Conditioner, TV, Microwave, etc.)
-- brand (company name if visible)
+        local_guess = None
+        classifier = await asyncio.to_thread(get_local_classifier)
+        if classifier:
+            try:
+                label, confidence = await asyncio.to_thread(
+                    classifier.classify, ingested.image
+                )
+                local_guess = {
+                    "applianceType": label,
+                    "brand": "",
+                    "model": "",
+                    "detectedText": "",
+                    "confidence": round(confidence, 4)
+                }
+            except Exception:
+                metrics.increment("detection_tier", "local_error")
 
-Return ONLY valid JSON.
+        if local_guess and local_guess["confidence"] >= LOCAL_CLASSIFIER_THRESHOLD:
+            metrics.increment("detection_tier", "local")
+            return local_guess
 
-{
-  "applianceType": "",
-  "brand": "",
-  "confidence": 0.0
-}
-"""
+        try:
+            # Only Gemini can read images, but routing still tracks its
+            # latency and errors alongside the text tasks.
+            result = await llm_router.generate(
+                "detect",
+                {"gemini": [DETECT_PROMPT, ingested.as_llm_part()]},
+                lambda raw: parse_json(raw, DETECT_SCHEMA),
+                schema=DETECT_SCHEMA,
+                max_output_tokens=DETECT_MAX_OUTPUT_TOKENS
+            )
+        except Exception:
+            if not local_guess:
+                raise
+            # Upstream is down or slow: a low-confidence local answer is
+            # better than none.
+            metrics.increment("detection_tier", "local_fallback")
+            return local_guess
 
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            response = model.generate_content([prompt, pil_img])
+        detection = {
+            "applianceType": result.get("applianceType", ""),
+            "brand": result.get("brand", ""),
+            "model": "",
+            "detectedText": "",
+            "confidence": result.get("confidence", 0.8)
+        }
+        await asyncio.to_thread(
+            detection_cache.store, digest, phash, detection
+        )
+        metrics.increment("detection_tier", "gemini")
+        return detection
 
-            raw = response.text.strip()
-            cleaned = re.sub(r"```json|```", "", raw).strip()
-            result = json.loads(cleaned)
+    @staticmethod
+    async def detect_appliance(image: UploadFile = File(...)):
+        try:
+            return JSONResponse(await DetectController.detect(image))
 
-            return JSONResponse({
-                "applianceType": result.get("applianceType", ""),
-                "brand": result.get("brand", ""),
-                "model": "",
-                "detectedText": "",
-                "confidence": result.get("confidence", 0.8)
-            })
+        except UploadTooLargeError as e:
+            return JSONResponse({"error": str(e)}, status_code=413)
 
         except Exception as e:
             return JSONResponse({"error": str(e)}, status_code=500)
+
+    @staticmethod
+    async def detect_appliance_batch(
+        images: list[UploadFile],
+        concurrency: int | None = None
+    ) -> AsyncIterator[str]:
+        if len(images) > DETECT_BATCH_MAX_IMAGES:
+            yield json.dumps({
+                "error": f"At most {DETECT_BATCH_MAX_IMAGES} images per batch"
+            }) + "\n"
+            return
+
+        semaphore = asyncio.Semaphore(
+            max(1, concurrency or DETECT_BATCH_CONCURRENCY)
+        )
+
+        async def detect_one(index: int, image: UploadFile) -> dict:
+            item = {"index": index, "filename": image.filename}
+            async with semaphore:
+                try:
+                    item.update(await DetectController.detect(image))
+                except Exception as e:
+                    item["error"] = str(e)
+            return item
+
+        tasks = [
+            asyncio.create_task(detect_one(index, image))
+            for index, image in enumerate(images)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,52 +1,218 @@
-import os
-import json
-import re
-from dotenv import load_dotenv
-import google.generativeai as genai
+import asyncio
+import logging
 
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from app.llm import (
+    ROUTED_MODEL,
+    LLMResponseError,
+    llm_cache,
+    llm_router,
+    parse_json,
+)
+from app.llm.cache import make_cache_key
+from app.utils.metrics import metrics
+from app.utils.service_intervals import interval_key, service_interval_table
+
+logger = logging.getLogger(__name__)
+
+SERVICE_INTERVAL_PROMPT = """
+Suggest the standard service interval in months (1-24) for this appliance,
+following industry practice and avoiding too frequent service, with a short
+reason.
+Appliance Type: {appliance_type}; Brand: {brand}; Model: {model}
+"""
+
+SERVICE_INTERVAL_BATCH_PROMPT = """
+Suggest the standard service interval in months (1-24) for each appliance
+below, following industry practice and avoiding too frequent service, with a
+short reason. Return one entry per appliance, using its id.
+{appliances}
+"""
+
+_INTERVAL_PROPERTIES = {
+    "intervalMonths": {"type": "integer"},
+    "reason": {"type": "string"}
+}
+SERVICE_INTERVAL_SCHEMA = {
+    "type": "object",
+    "properties": _INTERVAL_PROPERTIES,
+    "required": ["intervalMonths", "reason"]
+}
+SERVICE_INTERVAL_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intervals": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, **_INTERVAL_PROPERTIES},
+                "required": ["id", "intervalMonths", "reason"]
+            }
+        }
+    },
+    "required": ["intervals"]
+}
+# One interval answer is under 100 tokens; the remainder is thinking room,
+# which counts against the limit. Batches add a per-item answer allowance.
+SERVICE_INTERVAL_MAX_OUTPUT_TOKENS = 2048
+SERVICE_INTERVAL_BATCH_TOKENS_PER_ITEM = 128
+
+
+def _prompt_args(
+    appliance_type: str,
+    brand: str | None,
+    model: str | None
+) -> dict:
+    return {
+        "appliance_type": appliance_type,
+        "brand": brand or "Unknown",
+        "model": model or "Unknown"
+    }
+
+
+def _interval(data: dict) -> dict:
+    return {
+        "intervalMonths": max(1, min(24, int(data["intervalMonths"]))),
+        "reason": data["reason"]
+    }
 
 
 class GeminiServiceIntervalController:
     @staticmethod
-    def get_service_interval_months(
+    async def get_service_interval_months(
         appliance_type: str,
         brand: str | None = None,
         model: str | None = None
     ) -> dict:
-        prompt = f"""
-You are a home appliance service expert.
-
-Given the appliance details, suggest the STANDARD service interval in MONTHS.
-
-Return ONLY valid JSON.
-No markdown. No explanation text outside JSON.
-
-JSON format:
-{{
-  "intervalMonths": number,
-  "reason": ""
-}}
-
-Rules:
-- intervalMonths must be between 1 and 24
-- Use industry best practices
-- Be conservative (avoid too frequent service)
-- Appliance Type: {appliance_type}
-- Brand: {brand or "Unknown"}
-- Model: {model or "Unknown"}
-"""
+        known = service_interval_table.lookup(appliance_type, brand, model)
+        if known:
+            metrics.increment("service_interval", "table")
+            return known
 
-        model_ai = genai.GenerativeModel("gemini-2.5-flash")
-        response = model_ai.generate_content(prompt)
+        args = _prompt_args(appliance_type, brand, model)
+        prompt = SERVICE_INTERVAL_PROMPT.format(**args)
 
-        raw = response.text.strip()
-        cleaned = re.sub(r"```json|```", "", raw).strip()
+        def parse(raw: str) -> dict:
+            return _interval(parse_json(raw, SERVICE_INTERVAL_SCHEMA))
 
-        data = json.loads(cleaned)
+        async def call():
+            return await llm_router.generate(
+                "service_interval",
+                prompt,
+                parse,
+                schema=SERVICE_INTERVAL_SCHEMA,
+                max_output_tokens=SERVICE_INTERVAL_MAX_OUTPUT_TOKENS
+            )
 
-        return {
-            "intervalMonths": int(data["intervalMonths"]),
-            "reason": data["reason"]
-        }
+        metrics.increment("service_interval", "llm")
+        interval = await llm_cache.get_or_call(
+            "service_interval",
+            ROUTED_MODEL,
+            SERVICE_INTERVAL_PROMPT,
+            args,
+            call
+        )
+        await asyncio.to_thread(
+            service_interval_table.store,
+            appliance_type,
+            brand,
+            model,
+            interval
+        )
+        return interval
+
+    @staticmethod
+    async def get_service_intervals(
+        appliances: list[tuple[str, str | None, str | None]]
+    ) -> list[dict | None]:
+        unique = {}
+        for appliance in appliances:
+            unique.setdefault(interval_key(*appliance), appliance)
+
+        resolved = {}
+        pending = []
+        for key, (appliance_type, brand, model) in unique.items():
+            known = service_interval_table.lookup(appliance_type, brand, model)
+            if known:
+                metrics.increment("service_interval", "table")
+                resolved[key] = known
+                continue
+
+            cache_key = make_cache_key(
+                ROUTED_MODEL,
+                SERVICE_INTERVAL_PROMPT,
+                _prompt_args(appliance_type, brand, model)
+            )
+            cached = await asyncio.to_thread(llm_cache.get, cache_key)
+            if cached:
+                metrics.increment("service_interval", "cache")
+                resolved[key] = cached
+                continue
+
+            pending.append((key, (appliance_type, brand, model), cache_key))
+
+        if pending:
+            # Everything still unknown goes to the LLM in a single prompt.
+            listing = "\n".join(
+                f"- id {index}: Appliance Type: {args['appliance_type']}; "
+                f"Brand: {args['brand']}; Model: {args['model']}"
+                for index, args in enumerate(
+                    _prompt_args(*appliance) for _, appliance, _ in pending
+                )
+            )
+            prompt = SERVICE_INTERVAL_BATCH_PROMPT.format(appliances=listing)
+
+            def parse(raw: str) -> dict[int, dict]:
+                answers = {
+                    int(entry["id"]): _interval(entry)
+                    for entry in parse_json(
+                        raw, SERVICE_INTERVAL_BATCH_SCHEMA
+                    )["intervals"]
+                }
+                if not answers:
+                    raise LLMResponseError("Empty interval list")
+                return answers
+
+            metrics.increment("service_interval", "llm_batch")
+            try:
+                answers = await llm_router.generate(
+                    "service_interval_batch",
+                    prompt,
+                    parse,
+                    schema=SERVICE_INTERVAL_BATCH_SCHEMA,
+                    max_output_tokens=(
+                        SERVICE_INTERVAL_MAX_OUTPUT_TOKENS
+                        + SERVICE_INTERVAL_BATCH_TOKENS_PER_ITEM * len(pending)
+                    )
+                )
+            except Exception:
+                # The appliances stay unresolved (None) rather than failing
+                # the whole request, but the failure must stay visible.
+                logger.exception(
+                    "Batch service interval lookup failed for %d appliances",
+                    len(pending)
+                )
+                metrics.increment("service_interval", "llm_batch_error")
+                answers = {}
+
+            for index, (key, appliance, cache_key) in enumerate(pending):
+                interval = answers.get(index)
+                if not interval:
+                    continue
+                appliance_type, brand, model = appliance
+                resolved[key] = interval
+                # Cached under the single-item key too, so a later
+                # /calculate-service-date-llm call reuses the batch answer.
+                await asyncio.to_thread(
+                    llm_cache.put, cache_key, "service_interval", interval
+                )
+                await asyncio.to_thread(
+                    service_interval_table.store,
+                    appliance_type,
+                    brand,
+                    model,
+                    interval
+                )
+
+        return [
+            resolved.get(interval_key(*appliance)) for appliance in appliances
+        ]
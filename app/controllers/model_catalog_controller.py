@@ -1,120 +1,109 @@
-import requests
-import json
-import re
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+import asyncio
+
+from app.llm import LLMResponseError, llm_router, parse_json
+from app.utils.background import run_in_background
+from app.utils.metrics import metrics
+from app.utils.model_catalog_store import (
+    MODEL_CATALOG_PREWARM_CONCURRENCY,
+    catalog_key,
+    model_catalog_store,
+    prewarm_pairs,
+)
+from app.utils.model_index import model_index
+from app.utils.single_flight import SingleFlight
+
+LLAMA3_MODELS_PROMPT = """
+List 5-10 real, popular {brand} {appliance_type} models.
+Do not invent models; use real product series.
+"""
 
-load_dotenv()
+GEMINI_MODELS_PROMPT = """
+List real, commonly sold {brand} {appliance_type} models, preferring the
+Indian market. Do not invent models.
+"""
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-OLLAMA_MODEL = "llama3"
+MODELS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "models": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "modelName": {"type": "string"},
+                    "capacity": {"type": "string"},
+                    "type": {"type": "string"}
+                },
+                "required": ["modelName"]
+            }
+        }
+    },
+    "required": ["models"]
+}
+# A model list runs to roughly 1-2k tokens, plus about 2k of thinking room.
+MODELS_MAX_OUTPUT_TOKENS = 4096
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-GEMINI_MODEL = "gemini-2.5-flash"
+_models_flight = SingleFlight()
 
 
 class ModelCatalogController:
 
     @staticmethod
-    def _parse_json(raw_text: str):
-        cleaned = re.sub(r"```json|```", "", raw_text).strip()
-        return json.loads(cleaned)
-
-    @staticmethod
-    def _get_models_llama3(appliance_type: str, brand: str):
-        prompt = f"""
-List real and popular models for:
-
-Appliance Type: {appliance_type}
-Brand: {brand}
-
-Rules:
-- Do NOT invent models
-- Use real product series
-- Return 5–10 models
-- JSON ONLY
-
-Format:
-{{
-  "models": [
-    {{
-      "modelName": "",
-      "capacity": "",
-      "type": ""
-    }}
-  ]
-}}
-"""
-
-        payload = {
-            "model": OLLAMA_MODEL,
-            "prompt": prompt,
-            "stream": False
-        }
-
-        response = requests.post(
-            OLLAMA_URL,
-            json=payload,
-            timeout=15
-        )
-        response.raise_for_status()
-
-        raw = response.json().get("response", "")
-        parsed = ModelCatalogController._parse_json(raw)
+    def _parse_models(raw_text: str):
+        parsed = parse_json(raw_text, MODELS_SCHEMA)
 
-        if not parsed.get("models"):
-            raise ValueError("Empty model list from llama3")
+        if not parsed["models"]:
+            raise LLMResponseError("Empty model list")
 
         return parsed
 
     @staticmethod
-    def _get_models_gemini(appliance_type: str, brand: str):
-        prompt = f"""
-You are an appliance expert.
-
-List real, commonly sold models for:
-Appliance Type: {appliance_type}
-Brand: {brand}
-
-Rules:
-- Do NOT hallucinate fake models
-- Prefer Indian market models if possible
-- JSON ONLY
-
-Format:
-{{
-  "models": [
-    {{
-      "modelName": "",
-      "capacity": "",
-      "type": ""
-    }}
-  ]
-}}
-"""
-
-        model = genai.GenerativeModel(GEMINI_MODEL)
-        response = model.generate_content(prompt)
-
-        parsed = ModelCatalogController._parse_json(response.text)
-
-        if not parsed.get("models"):
-            raise ValueError("Empty model list from Gemini")
+    async def _get_models_routed(appliance_type: str, brand: str):
+        args = {"appliance_type": appliance_type, "brand": brand}
+        return await llm_router.generate(
+            "model_catalog",
+            {
+                "ollama": LLAMA3_MODELS_PROMPT.format(**args),
+                "gemini": GEMINI_MODELS_PROMPT.format(**args)
+            },
+            ModelCatalogController._parse_models,
+            schema=MODELS_SCHEMA,
+            max_output_tokens=MODELS_MAX_OUTPUT_TOKENS
+        )
 
-        return parsed
+    @staticmethod
+    async def get_models(appliance_type: str, brand: str):
+        key = catalog_key(appliance_type, brand)
+        entry = await asyncio.to_thread(model_catalog_store.get, key)
+
+        if entry:
+            fetched_at, catalog = entry
+            if model_catalog_store.is_fresh(fetched_at):
+                metrics.increment("model_catalog", "fresh")
+            else:
+                # Serve the stale lineup now and refresh it for next time.
+                metrics.increment("model_catalog", "stale")
+                run_in_background(
+                    ModelCatalogController.refresh(appliance_type, brand)
+                )
+            return catalog
+
+        metrics.increment("model_catalog", "miss")
+        return await ModelCatalogController.refresh(appliance_type, brand)
 
     @staticmethod
-    def get_models(appliance_type: str, brand: str):
-        try:
-            return ModelCatalogController._get_models_llama3(
+    async def refresh(appliance_type: str, brand: str):
+        return await _models_flight.do(
+            catalog_key(appliance_type, brand),
+            lambda: ModelCatalogController._fetch_models(
                 appliance_type, brand
             )
-        except Exception:
-            pass
+        )
 
+    @staticmethod
+    async def _fetch_models(appliance_type: str, brand: str):
         try:
-            return ModelCatalogController._get_models_gemini(
+            catalog = await ModelCatalogController._get_models_routed(
                 appliance_type, brand
             )
         except Exception as e:
@@ -122,3 +111,54 @@ Format:
                 "error": "Unable to fetch models from LLMs",
                 "details": str(e)
             }
+
+        await asyncio.to_thread(
+            model_catalog_store.put,
+            catalog_key(appliance_type, brand),
+            catalog
+        )
+        await asyncio.to_thread(
+            model_index.add, appliance_type, brand, catalog["models"], "llm"
+        )
+        return catalog
+
+    @staticmethod
+    def search_models(
+        query: str,
+        appliance_type: str | None = None,
+        brand: str | None = None,
+        limit: int = 10
+    ):
+        return {
+            "query": query,
+            "results": model_index.search(
+                query, appliance_type, brand, max(1, min(limit, 50))
+            )
+        }
+
+    @staticmethod
+    async def prewarm(
+        pairs: list[tuple[str, str]] | None = None,
+        force: bool = False
+    ) -> int:
+        semaphore = asyncio.Semaphore(max(1, MODEL_CATALOG_PREWARM_CONCURRENCY))
+
+        async def warm(appliance_type: str, brand: str) -> bool:
+            if not force:
+                entry = await asyncio.to_thread(
+                    model_catalog_store.get,
+                    catalog_key(appliance_type, brand)
+                )
+                if entry and model_catalog_store.is_fresh(entry[0]):
+                    return False
+            async with semaphore:
+                catalog = await ModelCatalogController.refresh(
+                    appliance_type, brand
+                )
+            return "error" not in catalog
+
+        warmed = await asyncio.gather(*(
+            warm(appliance_type, brand)
+            for appliance_type, brand in pairs or prewarm_pairs()
+        ))
+        return sum(warmed)
@@ -1,149 +1,358 @@
-import json
+import asyncio
+import logging
 import os
-import re
-from typing import Any
+from typing import Any, AsyncIterator
 
-from dotenv import load_dotenv
+import orjson
 from fastapi.responses import JSONResponse
-import google.generativeai as genai
-import requests
 
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from app.llm import ROUTED_MODEL, llm_cache, llm_router, parse_json
+from app.utils.overpass import (
+    OsmTag,
+    OverpassError,
+    element_coords,
+    element_id,
+    fetch_elements,
+    route_by_tag,
+)
+from app.utils.geo import haversine_m
+from app.utils.local_plans import normalize_query, seeded_plan
+from app.utils.metrics import metrics
+from app.utils.osm_index import osm_poi_index
+from app.utils.overpass_tiles import overpass_tile_cache
+from app.utils.place_format import DEFAULT_PLACE_FIELDS, project_place
+from app.utils.place_ranking import ServiceCenterRanker
+from app.utils.responses import FastJSONResponse
+from app.utils.single_flight import SingleFlight
+
+LOCAL_SERVICES_PLAN_PROMPT = """
+Plan a local services search for the user request "{query}": one primary
+category that best matches it and 2-5 related ones, each with a 1-3 word
+label and 1-4 OpenStreetMap tags (keys like shop, amenity, office, tourism,
+leisure).
+"""
+
+LOCAL_SERVICES_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "categories": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "label": {"type": "string"},
+                    "priority": {
+                        "type": "string",
+                        "enum": ["primary", "related"]
+                    },
+                    "osmTags": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "key": {"type": "string"},
+                                "value": {"type": "string"}
+                            },
+                            "required": ["key", "value"]
+                        }
+                    }
+                },
+                "required": ["label", "priority", "osmTags"]
+            }
+        }
+    },
+    "required": ["categories"]
+}
+# The category plan is small JSON; thinking spends most of this budget.
+LOCAL_SERVICES_PLAN_MAX_OUTPUT_TOKENS = 4096
+
+DEFAULT_LAT = 11.0168
+DEFAULT_LON = 76.9558
+
+OSM_SHOP_MAP = {
+    "washing machine": ["appliance", "electronics", "repair"],
+    "refrigerator": ["appliance", "electronics", "repair"],
+    "air conditioner": ["appliance", "electronics", "repair"],
+    "television": ["electronics", "repair"],
+    "microwave": ["electronics", "repair"],
+    "dishwasher": ["appliance", "repair"],
+    "water purifier": ["electronics", "repair"],
+    "motorcycle": ["motorcycle", "repair", "car_repair"],
+    "bike": ["motorcycle", "repair"]
+}
+
+# Shop types covering most entries of OSM_SHOP_MAP, prefetched before the
+# appliance type is known.
+SPECULATIVE_SHOP_TYPES = ["repair", "electronics", "appliance"]
+
+# Clamped so a misconfigured start or growth can never stall the radius.
+PROGRESSIVE_START_RADIUS_M = max(
+    1, int(os.getenv("PROGRESSIVE_START_RADIUS_M", "1000"))
+)
+PROGRESSIVE_GROWTH = max(1.1, float(os.getenv("PROGRESSIVE_GROWTH", "2.0")))
+PROGRESSIVE_MAX_STEPS = max(1, int(os.getenv("PROGRESSIVE_MAX_STEPS", "6")))
+
+LOCAL_SERVICES_CONCURRENCY = int(os.getenv("LOCAL_SERVICES_CONCURRENCY", "4"))
+LOCAL_SERVICES_DEADLINE_S = float(
+    os.getenv("LOCAL_SERVICES_DEADLINE_S", "12")
+)
+
+logger = logging.getLogger(__name__)
+
+_overpass_flight = SingleFlight()
+
 
-GEMINI_MODEL = "gemini-2.5-flash"
+def _ndjson(payload: dict[str, Any]) -> bytes:
+    return orjson.dumps(payload) + b"\n"
 
 
 class ServiceCenterController:
 
     @staticmethod
-    def _parse_json(raw_text: str) -> dict[str, Any]:
-        cleaned = re.sub(r"```json|```", "", raw_text).strip()
-        return json.loads(cleaned)
+    async def _fetch_overpass(query: str) -> list[dict[str, Any]]:
+        return await _overpass_flight.do(
+            query,
+            lambda: fetch_elements(query)
+        )
 
     @staticmethod
-    def _query_overpass(
-        tag_key: str,
-        tag_value: str,
+    async def _query_overpass(
+        tags: list[OsmTag],
         user_lat: float,
         user_lon: float,
-        radius_m: int
+        radius_m: int,
+        fill_cache: bool = True
     ) -> list[dict[str, Any]]:
-        overpass_url = "https://overpass-api.de/api/interpreter"
-        query = f"""
-        [out:json];
-        (
-          node["{tag_key}"="{tag_value}"](around:{radius_m},{user_lat},{user_lon});
-          way["{tag_key}"="{tag_value}"](around:{radius_m},{user_lat},{user_lon});
-        );
-        out center;
-        """
-
-        res = requests.get(
-            overpass_url,
-            params={"data": query},
-            timeout=15
-        )
-        if res.status_code != 200:
+        tags = list(dict.fromkeys(tags))
+        if not tags:
             return []
-        return res.json().get("elements", [])
 
-    @staticmethod
-    async def find_service_centers(appliance_type: str, brand: str):
-        try:
-            user_lat = 11.0168
-            user_lon = 76.9558
-
-            appliance = appliance_type.lower()
-            brand_lower = brand.lower()
-
-            OSM_SHOP_MAP = {
-                "washing machine": ["appliance", "electronics", "repair"],
-                "refrigerator": ["appliance", "electronics", "repair"],
-                "air conditioner": ["appliance", "electronics", "repair"],
-                "television": ["electronics", "repair"],
-                "microwave": ["electronics", "repair"],
-                "dishwasher": ["appliance", "repair"],
-                "water purifier": ["electronics", "repair"],
-                "motorcycle": ["motorcycle", "repair", "car_repair"],
-                "bike": ["motorcycle", "repair"]
-            }
-
-            shop_types = OSM_SHOP_MAP.get(
-                appliance, ["repair", "electronics"]
+        elements = []
+        if await asyncio.to_thread(
+            osm_poi_index.covers, user_lat, user_lon, radius_m
+        ):
+            local_tags = [tag for tag in tags if osm_poi_index.supports(tag)]
+            tags = [tag for tag in tags if not osm_poi_index.supports(tag)]
+            elements = await asyncio.to_thread(
+                osm_poi_index.query,
+                local_tags,
+                user_lat,
+                user_lon,
+                radius_m
             )
+            if not tags:
+                return elements
 
-            overpass_url = "https://overpass-api.de/api/interpreter"
-            centers = []
-
-            for shop_type in shop_types:
-                query = f"""
-                [out:json];
-                (
-                  node["shop"="{shop_type}"](around:6000,{user_lat},{user_lon});
-                  way["shop"="{shop_type}"](around:6000,{user_lat},{user_lon});
-                );
-                out center;
-                """
-
-                res = requests.get(
-                    overpass_url,
-                    params={"data": query},
-                    timeout=15
-                )
+        try:
+            elements += await overpass_tile_cache.query(
+                tags,
+                user_lat,
+                user_lon,
+                radius_m,
+                ServiceCenterController._fetch_overpass,
+                fill_cache
+            )
+        except OverpassError as exc:
+            # Still serve whatever the local index had, but make the outage
+            # visible instead of passing it off as "no places found".
+            logger.warning("Overpass lookup failed for %s: %s", tags, exc)
+            metrics.increment("overpass", "error")
+        return elements
 
-                if res.status_code != 200:
-                    continue
+    @staticmethod
+    def _search_radii(radius_m: int, progressive: bool) -> list[int]:
+        if not progressive:
+            return [radius_m]
 
-                data = res.json()
+        # Steps short of radius_m query Overpass with their own around:
+        # radius (or reuse cached tiles); only the final step fetches tiles.
 
-                for el in data.get("elements", []):
-                    tags = el.get("tags", {})
-                    text_blob = " ".join(tags.values()).lower()
+        radii = []
+        radius = min(PROGRESSIVE_START_RADIUS_M, radius_m)
+        while radius < radius_m and len(radii) < PROGRESSIVE_MAX_STEPS - 1:
+            radii.append(radius)
+            radius = max(radius + 1, int(radius * PROGRESSIVE_GROWTH))
+        radii.append(radius_m)
+        return radii
 
-                    score = 0
+    @staticmethod
+    def _category_tags(category: dict[str, Any]) -> list[OsmTag]:
+        tags = []
+        for tag in category.get("osmTags", []):
+            key = tag.get("key")
+            value = tag.get("value")
+            if key and value:
+                tags.append((key, value))
+        return tags
 
-                    if brand_lower and brand_lower in text_blob:
-                        score += 3
+    @staticmethod
+    def _category_places(
+        label: str,
+        tags: list[OsmTag],
+        by_tag: dict[OsmTag, list[dict[str, Any]]],
+        user_lat: float,
+        user_lon: float,
+        limit: int
+    ) -> list[dict[str, Any]]:
+        seen = set()
+        places = []
 
-                    if appliance in text_blob:
-                        score += 2
+        for tag in tags:
+            for el in by_tag.get(tag, []):
+                osm_id = element_id(el)
+                if osm_id in seen:
+                    continue
+                seen.add(osm_id)
 
-                    if "repair" in text_blob or "service" in text_blob:
-                        score += 1
+                tags_blob = el.get("tags", {})
+                el_lat, el_lon = element_coords(el)
+                if not el_lat or not el_lon:
+                    continue
 
-                    if tags.get("shop") in ["electronics", "repair", "appliance"]:
-                        score += 0.5
+                places.append({
+                    "name": tags_blob.get("name", label.title()),
+                    "lat": el_lat,
+                    "lon": el_lon,
+                    "distance": haversine_m(user_lat, user_lon, el_lat, el_lon),
+                    "tags": tags_blob
+                })
 
-                    if score < 1:
-                        continue
+        # The limit applies to the nearest places within the radius, never to
+        # whatever Overpass happened to list first.
+        places.sort(key=lambda place: place["distance"])
+        return places[:limit]
 
-                    lat = el.get("lat") or el.get("center", {}).get("lat")
-                    lon = el.get("lon") or el.get("center", {}).get("lon")
+    @staticmethod
+    async def _search_category(
+        label: str,
+        tags: list[OsmTag],
+        lat: float,
+        lon: float,
+        radius_m: int,
+        limit: int,
+        progressive: bool
+    ) -> tuple[list[dict[str, Any]], int]:
+        places = []
+        for radius in ServiceCenterController._search_radii(
+            radius_m, progressive
+        ):
+            elements = await ServiceCenterController._query_overpass(
+                tags,
+                lat,
+                lon,
+                radius,
+                radius == radius_m
+            )
+            places = ServiceCenterController._category_places(
+                label,
+                tags,
+                route_by_tag(elements, tags),
+                lat,
+                lon,
+                limit
+            )
+            if len(places) >= limit:
+                break
+        return places, radius
 
-                    if not lat or not lon:
-                        continue
+    @staticmethod
+    def _shop_tags(appliance_type: str) -> list[OsmTag]:
+        shop_types = OSM_SHOP_MAP.get(
+            appliance_type.lower(), ["repair", "electronics"]
+        )
+        return [("shop", shop_type) for shop_type in shop_types]
 
-                    centers.append({
-                        "name": tags.get("name", "Service Center"),
-                        "latitude": lat,
-                        "longitude": lon,
-                        "address": tags,
-                        "mapUrl": (
-                            f"https://www.openstreetmap.org/"
-                            f"?mlat={lat}&mlon={lon}#map=17/{lat}/{lon}"
-                        ),
-                        "matchScore": score
-                    })
+    @staticmethod
+    async def prefetch_service_centers(
+        user_lat: float | None = None,
+        user_lon: float | None = None,
+        radius_m: int = 6000
+    ):
+        # Warms the tile cache for the shop types most appliances map to,
+        # before the appliance itself is known.
+        await ServiceCenterController._query_overpass(
+            [("shop", shop_type) for shop_type in SPECULATIVE_SHOP_TYPES],
+            user_lat if user_lat is not None else DEFAULT_LAT,
+            user_lon if user_lon is not None else DEFAULT_LON,
+            radius_m
+        )
 
-            centers.sort(
-                key=lambda x: x["matchScore"],
-                reverse=True
+    @staticmethod
+    async def search_service_centers(
+        appliance_type: str,
+        brand: str,
+        user_lat: float | None = None,
+        user_lon: float | None = None,
+        radius_m: int = 6000,
+        limit: int = 10,
+        progressive: bool = False,
+        fields: tuple[str, ...] = DEFAULT_PLACE_FIELDS
+    ) -> dict[str, Any]:
+        user_lat = user_lat if user_lat is not None else DEFAULT_LAT
+        user_lon = user_lon if user_lon is not None else DEFAULT_LON
+
+        tags = ServiceCenterController._shop_tags(appliance_type)
+        ranker = ServiceCenterRanker(appliance_type, brand)
+
+        for radius in ServiceCenterController._search_radii(
+            radius_m, progressive
+        ):
+            elements = await ServiceCenterController._query_overpass(
+                tags,
+                user_lat,
+                user_lon,
+                radius,
+                radius == radius_m
+            )
+            ranked = ranker.rank(
+                elements, user_lat, user_lon, radius_m, top_k=limit
             )
+            if len(ranked) >= limit:
+                break
+
+        centers = []
+
+        for score, distance, el in ranked:
+            el_tags = el.get("tags", {})
+            lat, lon = element_coords(el)
+            centers.append(project_place({
+                "name": el_tags.get("name", "Service Center"),
+                "lat": lat,
+                "lon": lon,
+                "distance": distance,
+                "tags": el_tags,
+                "matchScore": round(score, 3)
+            }, fields))
+
+        return {
+            "radiusMeters": radius,
+            "serviceCenters": centers
+        }
 
-            return JSONResponse({
-                "serviceCenters": centers[:10]
-            })
+    @staticmethod
+    async def find_service_centers(
+        appliance_type: str,
+        brand: str,
+        user_lat: float | None = None,
+        user_lon: float | None = None,
+        radius_m: int = 6000,
+        limit: int = 10,
+        progressive: bool = False,
+        fields: tuple[str, ...] = DEFAULT_PLACE_FIELDS
+    ):
+        try:
+            return FastJSONResponse(
+                await ServiceCenterController.search_service_centers(
+                    appliance_type,
+                    brand,
+                    user_lat,
+                    user_lon,
+                    radius_m,
+                    limit,
+                    progressive,
+                    fields
+                )
+            )
 
         except Exception as e:
             return JSONResponse(
@@ -154,140 +363,169 @@ class ServiceCenterController:
                 status_code=500
             )
 
+    @staticmethod
+    async def _plan_local_services(query: str) -> list[dict[str, Any]]:
+        normalized = normalize_query(query) or query.strip().lower()
+        parsed = seeded_plan(normalized)
+
+        if parsed:
+            metrics.increment("local_services_plan", "seeded")
+        else:
+            prompt = LOCAL_SERVICES_PLAN_PROMPT.format(query=query)
+
+            async def plan():
+                metrics.increment("local_services_plan", "llm")
+                return await llm_router.generate(
+                    "local_services_plan",
+                    prompt,
+                    lambda raw: parse_json(raw, LOCAL_SERVICES_PLAN_SCHEMA),
+                    schema=LOCAL_SERVICES_PLAN_SCHEMA,
+                    max_output_tokens=LOCAL_SERVICES_PLAN_MAX_OUTPUT_TOKENS
+                )
+
+            # Keyed on the normalized query so phrasing variants of the same
+            # intent share one cached plan.
+            parsed = await llm_cache.get_or_call(
+                "local_services_plan",
+                ROUTED_MODEL,
+                LOCAL_SERVICES_PLAN_PROMPT,
+                {"query": normalized},
+                plan
+            )
+
+        categories = parsed.get("categories", [])
+
+        if not categories:
+            categories = [
+                {
+                    "label": "groceries",
+                    "osmTags": [
+                        {"key": "shop", "value": "supermarket"},
+                        {"key": "shop", "value": "convenience"},
+                        {"key": "shop", "value": "greengrocer"}
+                    ]
+                },
+                {
+                    "label": "hardware",
+                    "osmTags": [
+                        {"key": "shop", "value": "hardware"},
+                        {"key": "shop", "value": "doityourself"}
+                    ]
+                },
+                {
+                    "label": "pharmacy",
+                    "osmTags": [
+                        {"key": "amenity", "value": "pharmacy"}
+                    ]
+                }
+            ]
+
+        return categories
+
+    @staticmethod
+    def _start_category_searches(
+        categories: list[dict[str, Any]],
+        lat: float,
+        lon: float,
+        radius_m: int,
+        limit_per_category: int,
+        progressive: bool
+    ) -> list[asyncio.Task]:
+        semaphore = asyncio.Semaphore(max(1, LOCAL_SERVICES_CONCURRENCY))
+
+        async def search(category: dict[str, Any]):
+            async with semaphore:
+                return await ServiceCenterController._search_category(
+                    category.get("label", "service"),
+                    ServiceCenterController._category_tags(category),
+                    lat,
+                    lon,
+                    radius_m,
+                    limit_per_category,
+                    progressive
+                )
+
+        return [
+            asyncio.create_task(search(category)) for category in categories
+        ]
+
+    @staticmethod
+    def _category_result(
+        category: dict[str, Any],
+        task: asyncio.Task,
+        radius_m: int,
+        fields: tuple[str, ...]
+    ) -> dict[str, Any]:
+        places, radius = [], radius_m
+        timed_out = not task.done() or task.cancelled()
+        failed = not timed_out and task.exception() is not None
+        if failed:
+            logger.warning(
+                "Local services search failed for %r",
+                category.get("label"),
+                exc_info=task.exception()
+            )
+            metrics.increment("local_services", "category_error")
+        elif not timed_out:
+            places, radius = task.result()
+
+        result = {
+            "label": category.get("label", "service"),
+            "count": len(places),
+            "radiusMeters": radius,
+            "places": [project_place(place, fields) for place in places]
+        }
+        if timed_out:
+            result["timedOut"] = True
+        if failed:
+            result["error"] = True
+        return result
+
     @staticmethod
     async def find_local_services_llm(
         query: str,
         user_lat: float | None = None,
         user_lon: float | None = None,
         limit_per_category: int = 6,
-        radius_m: int = 6000
+        radius_m: int = 6000,
+        progressive: bool = False,
+        fields: tuple[str, ...] = DEFAULT_PLACE_FIELDS
     ):
         try:
-            lat = user_lat if user_lat is not None else 11.0168
-            lon = user_lon if user_lon is not None else 76.9558
-
-            prompt = f"""
-You are a local services planner.
-
-User request: "{query}"
-
-Return ONLY valid JSON. No markdown.
-
-Format:
-{{
-  "categories": [
-    {{
-      "label": "",
-      "priority": "primary|related",
-      "osmTags": [
-        {{"key": "shop", "value": ""}}
-      ]
-    }}
-  ]
-}}
-
-Rules:
-- Use OpenStreetMap tag keys like shop, amenity, office, tourism, leisure
-- Include 1 primary category that best matches the user request
-- Include 2 to 5 related categories
-- 1 to 4 osmTags per category
-- Keep labels short (1 to 3 words)
-"""
+            lat = user_lat if user_lat is not None else DEFAULT_LAT
+            lon = user_lon if user_lon is not None else DEFAULT_LON
 
-            model = genai.GenerativeModel(GEMINI_MODEL)
-            response = model.generate_content(prompt)
-            parsed = ServiceCenterController._parse_json(response.text)
-            categories = parsed.get("categories", [])
-
-            if not categories:
-                categories = [
-                    {
-                        "label": "groceries",
-                        "osmTags": [
-                            {"key": "shop", "value": "supermarket"},
-                            {"key": "shop", "value": "convenience"},
-                            {"key": "shop", "value": "greengrocer"}
-                        ]
-                    },
-                    {
-                        "label": "hardware",
-                        "osmTags": [
-                            {"key": "shop", "value": "hardware"},
-                            {"key": "shop", "value": "doityourself"}
-                        ]
-                    },
-                    {
-                        "label": "pharmacy",
-                        "osmTags": [
-                            {"key": "amenity", "value": "pharmacy"}
-                        ]
-                    }
-                ]
-
-            results = []
-            total_count = 0
-
-            for category in categories:
-                label = category.get("label", "service")
-                tags = category.get("osmTags", [])
-                seen = set()
-                places = []
-
-                for tag in tags:
-                    key = tag.get("key")
-                    value = tag.get("value")
-                    if not key or not value:
-                        continue
-
-                    elements = ServiceCenterController._query_overpass(
-                        key,
-                        value,
-                        lat,
-                        lon,
-                        radius_m
-                    )
-
-                    for el in elements:
-                        osm_id = f"{el.get('type','')}_{el.get('id','')}"
-                        if osm_id in seen:
-                            continue
-                        seen.add(osm_id)
-
-                        tags_blob = el.get("tags", {})
-                        lat = el.get("lat") or el.get("center", {}).get("lat")
-                        lon = el.get("lon") or el.get("center", {}).get("lon")
-                        if not lat or not lon:
-                            continue
-
-                        places.append({
-                            "name": tags_blob.get("name", label.title()),
-                            "latitude": lat,
-                            "longitude": lon,
-                            "address": tags_blob,
-                            "mapUrl": (
-                                f"https://www.openstreetmap.org/"
-                                f"?mlat={lat}&mlon={lon}#map=17/{lat}/{lon}"
-                            )
-                        })
-
-                    if len(places) >= limit_per_category:
-                        break
-
-                places = places[:limit_per_category]
-                total_count += len(places)
-                results.append({
-                    "label": label,
-                    "count": len(places),
-                    "places": places
-                })
+            categories = await ServiceCenterController._plan_local_services(
+                query
+            )
+            tasks = ServiceCenterController._start_category_searches(
+                categories, lat, lon, radius_m, limit_per_category, progressive
+            )
+            _, pending = await asyncio.wait(
+                tasks, timeout=LOCAL_SERVICES_DEADLINE_S
+            )
+            for task in pending:
+                task.cancel()
 
-            return JSONResponse({
+            results = [
+                ServiceCenterController._category_result(
+                    category, task, radius_m, fields
+                )
+                for category, task in zip(categories, tasks)
+            ]
+            radii = [
+                result["radiusMeters"] for result in results
+                if not result.get("timedOut")
+            ]
+
+            return FastJSONResponse({
                 "query": query,
                 "latitude": lat,
                 "longitude": lon,
-                "radiusMeters": radius_m,
+                "radiusMeters": max(radii, default=radius_m),
                 "categories": results,
-                "total": total_count
+                "total": sum(result["count"] for result in results),
+                "partial": bool(pending)
             })
 
         except Exception as e:
@@ -298,3 +536,91 @@ Rules:
                 },
                 status_code=500
             )
+
+    @staticmethod
+    async def stream_local_services(
+        query: str,
+        user_lat: float | None = None,
+        user_lon: float | None = None,
+        limit_per_category: int = 6,
+        radius_m: int = 6000,
+        progressive: bool = False,
+        fields: tuple[str, ...] = DEFAULT_PLACE_FIELDS
+    ) -> AsyncIterator[bytes]:
+        lat = user_lat if user_lat is not None else DEFAULT_LAT
+        lon = user_lon if user_lon is not None else DEFAULT_LON
+
+        try:
+            categories = await ServiceCenterController._plan_local_services(
+                query
+            )
+        except Exception as e:
+            yield _ndjson({
+                "type": "error",
+                "error": "Local services lookup failed",
+                "details": str(e)
+            })
+            return
+
+        yield _ndjson({
+            "type": "plan",
+            "query": query,
+            "latitude": lat,
+            "longitude": lon,
+            "categories": [
+                {
+                    "index": index,
+                    "label": category.get("label", "service"),
+                    "priority": category.get("priority", "related")
+                }
+                for index, category in enumerate(categories)
+            ]
+        })
+
+        tasks = ServiceCenterController._start_category_searches(
+            categories, lat, lon, radius_m, limit_per_category, progressive
+        )
+        index_of = {task: index for index, task in enumerate(tasks)}
+        deadline = asyncio.get_running_loop().time() + LOCAL_SERVICES_DEADLINE_S
+        pending = set(tasks)
+        total_count = 0
+
+        try:
+            while pending:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=index_of.get):
+                    index = index_of[task]
+                    result = ServiceCenterController._category_result(
+                        categories[index], task, radius_m, fields
+                    )
+                    total_count += result["count"]
+                    yield _ndjson(
+                        {"type": "category", "index": index, **result}
+                    )
+
+            for task in sorted(pending, key=index_of.get):
+                task.cancel()
+                index = index_of[task]
+                yield _ndjson({
+                    "type": "category",
+                    "index": index,
+                    **ServiceCenterController._category_result(
+                        categories[index], task, radius_m, fields
+                    )
+                })
+
+            yield _ndjson({
+                "type": "done",
+                "total": total_count,
+                "partial": bool(pending)
+            })
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,29 @@
+from app.llm.gateway import (
+    GEMINI_MODEL,
+    OLLAMA_MODEL,
+    LLMTimeoutError,
+    generate_gemini,
+    generate_gemini_sync,
+    generate_ollama,
+    generate_ollama_sync,
+    shutdown,
+)
+from app.llm.cache import llm_cache
+from app.llm.router import ROUTED_MODEL, llm_router
+from app.llm.structured import LLMResponseError, parse_json
+
+__all__ = [
+    "GEMINI_MODEL",
+    "OLLAMA_MODEL",
+    "LLMResponseError",
+    "LLMTimeoutError",
+    "ROUTED_MODEL",
+    "generate_gemini",
+    "generate_gemini_sync",
+    "generate_ollama",
+    "generate_ollama_sync",
+    "llm_cache",
+    "llm_router",
+    "parse_json",
+    "shutdown",
+]
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import func
+
+from app.db import SessionLocal
+from app.models.llm_cache_orm import LLMCacheORM
+from app.utils.single_flight import SingleFlight
+
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LLM_CACHE_DEFAULT_TTL_S = float(os.getenv("LLM_CACHE_DEFAULT_TTL_S", "86400"))
+LLM_CACHE_EVICT_EVERY = 100
+
+# Per call site TTLs; override with LLM_CACHE_TTL_<SITE> (seconds).
+LLM_CACHE_TTLS = {
+    "service_interval": 30 * 86400,
+    "local_services_plan": 7 * 86400,
+    "event_notes": 86400,
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _site_ttl(site: str) -> float:
+    override = os.getenv(f"LLM_CACHE_TTL_{site.upper()}")
+    if override:
+        return float(override)
+    return LLM_CACHE_TTLS.get(site, LLM_CACHE_DEFAULT_TTL_S)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip().lower()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(model: str, template: str, args: dict[str, Any]) -> str:
+    payload = json.dumps(
+        [model, _WHITESPACE.sub(" ", template).strip(), _normalize(args)],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+
+    def __init__(
+        self,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES
+    ):
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._flight = SingleFlight()
+
+    def _memory_get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_put(self, key: str, expires_at: float, value: Any):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _db_get(self, key: str) -> Any | None:
+        now = time.time()
+        db = SessionLocal()
+        try:
+            record = db.get(LLMCacheORM, key)
+            if not record:
+                return None
+            if record.expires_at <= now:
+                db.delete(record)
+                db.commit()
+                return None
+            record.last_access = now
+            db.commit()
+            value = json.loads(record.value_json)
+            self._memory_put(key, record.expires_at, value)
+            return value
+        finally:
+            db.close()
+
+    def _db_put(self, key: str, site: str, value: Any, ttl: float):
+        now = time.time()
+        value_json = json.dumps(value, separators=(",", ":"))
+        db = SessionLocal()
+        try:
+            db.merge(LLMCacheORM(
+                key=key,
+                site=site,
+                value_json=value_json,
+                size_bytes=len(value_json),
+                created_at=now,
+                expires_at=now + ttl,
+                last_access=now
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._writes += 1
+            should_evict = self._writes % LLM_CACHE_EVICT_EVERY == 0
+        if should_evict:
+            self.evict()
+
+    def evict(self):
+        db = SessionLocal()
+        try:
+            db.query(LLMCacheORM).filter(
+                LLMCacheORM.expires_at <= time.time()
+            ).delete(synchronize_session=False)
+
+            total = db.query(
+                func.coalesce(func.sum(LLMCacheORM.size_bytes), 0)
+            ).scalar()
+            if total > self.max_bytes:
+                rows = (
+                    db.query(LLMCacheORM.key, LLMCacheORM.size_bytes)
+                    .order_by(LLMCacheORM.last_access)
+                    .all()
+                )
+                stale_keys = []
+                for key, size_bytes in rows:
+                    if total <= self.max_bytes:
+                        break
+                    stale_keys.append(key)
+                    total -= size_bytes
+                db.query(LLMCacheORM).filter(
+                    LLMCacheORM.key.in_(stale_keys)
+                ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, key: str) -> Any | None:
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        return self._db_get(key)
+
+    def put(self, key: str, site: str, value: Any, ttl: float | None = None):
+        ttl = _site_ttl(site) if ttl is None else ttl
+        self._memory_put(key, time.time() + ttl, value)
+        self._db_put(key, site, value, ttl)
+
+    async def get_or_call(
+        self,
+        site: str,
+        model: str,
+        template: str,
+        args: dict[str, Any],
+        call: Callable[[], Awaitable[Any]],
+        ttl: float | None = None
+    ) -> Any:
+        key = make_cache_key(model, template, args)
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+
+        async def load():
+            value = await asyncio.to_thread(self._db_get, key)
+            if value is not None:
+                return value
+
+            value = await call()
+            await asyncio.to_thread(self.put, key, site, value, ttl)
+            return value
+
+        return await self._flight.do(key, load)
+
+    def get_or_call_sync(
+        self,
+        site: str,
+        model: str,
+        template: str,
+        args: dict[str, Any],
+        call: Callable[[], Any],
+        ttl: float | None = None
+    ) -> Any:
+        key = make_cache_key(model, template, args)
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        value = call()
+        self.put(key, site, value, ttl)
+        return value
+
+
+llm_cache = LLMResponseCache()
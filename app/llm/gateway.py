@@ -0,0 +1,214 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from typing import Any, Callable
+
+import google.generativeai as genai
+import requests
+from dotenv import load_dotenv
+
+from app.llm.structured import LLMResponseError
+
+load_dotenv()
+genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_TIMEOUT_S = float(os.getenv("GEMINI_TIMEOUT_S", "30"))
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+OLLAMA_TIMEOUT_S = float(os.getenv("OLLAMA_TIMEOUT_S", "15"))
+
+# One bounded pool per backend: the pool size is the concurrency limit, and
+# blocking SDK calls never run on the event loop thread.
+_EXECUTORS = {
+    "gemini": ThreadPoolExecutor(
+        max_workers=GEMINI_MAX_CONCURRENCY,
+        thread_name_prefix="llm-gemini"
+    ),
+    "ollama": ThreadPoolExecutor(
+        max_workers=OLLAMA_MAX_CONCURRENCY,
+        thread_name_prefix="llm-ollama"
+    ),
+}
+
+_MAX_WORKERS = {
+    "gemini": GEMINI_MAX_CONCURRENCY,
+    "ollama": OLLAMA_MAX_CONCURRENCY,
+}
+# Calls submitted to each pool and not yet finished, including ones whose
+# caller already gave up: a cancelled await cannot stop a blocking call.
+_in_flight = {backend: 0 for backend in _EXECUTORS}
+_in_flight_lock = threading.Lock()
+
+_ollama_session = requests.Session()
+
+
+class LLMTimeoutError(TimeoutError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _gemini_model(model_name: str) -> genai.GenerativeModel:
+    return genai.GenerativeModel(model_name)
+
+
+def _gemini_config(
+    schema: dict[str, Any] | None,
+    max_output_tokens: int | None
+) -> dict[str, Any] | None:
+    config = {}
+    if schema:
+        config["response_mime_type"] = "application/json"
+        config["response_schema"] = schema
+    if max_output_tokens:
+        config["max_output_tokens"] = max_output_tokens
+    return config or None
+
+
+def _call_gemini(
+    contents: Any,
+    model_name: str,
+    timeout: float,
+    schema: dict[str, Any] | None = None,
+    max_output_tokens: int | None = None
+) -> str:
+    response = _gemini_model(model_name).generate_content(
+        contents,
+        generation_config=_gemini_config(schema, max_output_tokens),
+        request_options={"timeout": timeout}
+    )
+    candidate = response.candidates[0] if response.candidates else None
+    if candidate is None or not candidate.content.parts:
+        reason = candidate.finish_reason.name if candidate else "NO_CANDIDATE"
+        raise LLMResponseError(f"Gemini returned no text ({reason})")
+    if candidate.finish_reason.name == "MAX_TOKENS":
+        raise LLMResponseError(
+            "Gemini stopped at max_output_tokens before finishing"
+        )
+    return response.text.strip()
+
+
+def _call_ollama(
+    prompt: str,
+    model_name: str,
+    timeout: float,
+    schema: dict[str, Any] | None = None,
+    max_output_tokens: int | None = None
+) -> str:
+    payload = {
+        "model": model_name,
+        "prompt": prompt,
+        "stream": False
+    }
+    if schema:
+        payload["format"] = schema
+    if max_output_tokens:
+        payload["options"] = {"num_predict": max_output_tokens}
+
+    response = _ollama_session.post(OLLAMA_URL, json=payload, timeout=timeout)
+    response.raise_for_status()
+    return response.json().get("response", "").strip()
+
+
+def backend_saturated(backend: str) -> bool:
+    with _in_flight_lock:
+        return _in_flight[backend] >= _MAX_WORKERS[backend]
+
+
+def _submit(backend: str, fn: Callable[..., str], *args) -> Future:
+    with _in_flight_lock:
+        _in_flight[backend] += 1
+    future = _EXECUTORS[backend].submit(fn, *args)
+
+    def release(_):
+        with _in_flight_lock:
+            _in_flight[backend] -= 1
+
+    # Fires once whether the call finishes, fails or is cancelled unstarted.
+    future.add_done_callback(release)
+    return future
+
+
+async def _run(backend: str, fn: Callable[..., str], *args, timeout: float) -> str:
+    future = asyncio.wrap_future(_submit(backend, fn, *args))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError as exc:
+        raise LLMTimeoutError(
+            f"{backend} call timed out after {timeout}s"
+        ) from exc
+
+
+def _run_sync(backend: str, fn: Callable[..., str], *args, timeout: float) -> str:
+    future = _submit(backend, fn, *args)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError as exc:
+        future.cancel()
+        raise LLMTimeoutError(
+            f"{backend} call timed out after {timeout}s"
+        ) from exc
+
+
+async def generate_gemini(
+    contents: Any,
+    model: str = GEMINI_MODEL,
+    timeout: float = GEMINI_TIMEOUT_S,
+    schema: dict[str, Any] | None = None,
+    max_output_tokens: int | None = None
+) -> str:
+    return await _run(
+        "gemini", _call_gemini, contents, model, timeout, schema,
+        max_output_tokens, timeout=timeout
+    )
+
+
+def generate_gemini_sync(
+    contents: Any,
+    model: str = GEMINI_MODEL,
+    timeout: float = GEMINI_TIMEOUT_S,
+    schema: dict[str, Any] | None = None,
+    max_output_tokens: int | None = None
+) -> str:
+    return _run_sync(
+        "gemini", _call_gemini, contents, model, timeout, schema,
+        max_output_tokens, timeout=timeout
+    )
+
+
+async def generate_ollama(
+    prompt: str,
+    model: str = OLLAMA_MODEL,
+    timeout: float = OLLAMA_TIMEOUT_S,
+    schema: dict[str, Any] | None = None,
+    max_output_tokens: int | None = None
+) -> str:
+    return await _run(
+        "ollama", _call_ollama, prompt, model, timeout, schema,
+        max_output_tokens, timeout=timeout
+    )
+
+
+def generate_ollama_sync(
+    prompt: str,
+    model: str = OLLAMA_MODEL,
+    timeout: float = OLLAMA_TIMEOUT_S,
+    schema: dict[str, Any] | None = None,
+    max_output_tokens: int | None = None
+) -> str:
+    return _run_sync(
+        "ollama", _call_ollama, prompt, model, timeout, schema,
+        max_output_tokens, timeout=timeout
+    )
+
+
+def shutdown():
+    for executor in _EXECUTORS.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _ollama_session.close()
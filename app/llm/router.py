@@ -0,0 +1,152 @@
+import os
+from typing import Any, Callable, Iterable, TypeVar
+
+from app.llm.gateway import (
+    GEMINI_MODEL,
+    OLLAMA_MODEL,
+    backend_saturated,
+    generate_gemini,
+    generate_gemini_sync,
+    generate_ollama,
+    generate_ollama_sync,
+)
+from app.utils.hedging import HealthStats, HedgedRace
+from app.utils.metrics import metrics
+
+LLM_HEDGE_DELAY_S = float(os.getenv("LLM_HEDGE_DELAY_S", "4"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+LLM_BREAKER_COOLDOWN_S = float(os.getenv("LLM_BREAKER_COOLDOWN_S", "60"))
+LLM_EWMA_ALPHA = 0.3
+
+# Latency is divided by the weight when ranking backends, so a healthy local
+# model is preferred unless the remote one is much faster.
+LLM_BACKEND_WEIGHTS = {
+    "ollama": float(os.getenv("LLM_WEIGHT_OLLAMA", "2.0")),
+    "gemini": float(os.getenv("LLM_WEIGHT_GEMINI", "1.0")),
+}
+LLM_BACKENDS = ("ollama", "gemini")
+
+# Cache key model for answers that may come from either backend.
+ROUTED_MODEL = f"{OLLAMA_MODEL}|{GEMINI_MODEL}"
+
+_GENERATORS = {
+    "ollama": generate_ollama,
+    "gemini": generate_gemini,
+}
+_SYNC_GENERATORS = {
+    "ollama": generate_ollama_sync,
+    "gemini": generate_gemini_sync,
+}
+
+T = TypeVar("T")
+
+
+class LLMRouter:
+
+    def __init__(self, hedge_delay_s: float = LLM_HEDGE_DELAY_S):
+        self._stats: dict[tuple[str, str], HealthStats] = {}
+        self._race = HedgedRace("llm_router", hedge_delay_s)
+
+    def _stats_for(self, task: str, backend: str) -> HealthStats:
+        key = (task, backend)
+        with self._race.lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = HealthStats(
+                    key,
+                    LLM_BREAKER_FAILURES,
+                    LLM_BREAKER_COOLDOWN_S,
+                    LLM_EWMA_ALPHA,
+                    LLM_BACKEND_WEIGHTS.get(backend, 1.0)
+                )
+            return stats
+
+    def _candidates(
+        self,
+        task: str,
+        backends: Iterable[str]
+    ) -> list[HealthStats]:
+        # With every breaker open, trying something still beats failing.
+        return self._race.ranked(
+            [self._stats_for(task, backend) for backend in backends],
+            include_open=True
+        )
+
+    @staticmethod
+    def _prompts(
+        prompt: Any,
+        backends: Iterable[str] | None
+    ) -> dict[str, Any]:
+        if isinstance(prompt, dict):
+            return prompt
+        return {backend: prompt for backend in backends or LLM_BACKENDS}
+
+    async def generate(
+        self,
+        task: str,
+        prompt: Any,
+        parse: Callable[[str], T] = str.strip,
+        backends: Iterable[str] | None = None,
+        schema: dict[str, Any] | None = None,
+        max_output_tokens: int | None = None
+    ) -> T:
+        prompts = self._prompts(prompt, backends)
+        options = {"schema": schema, "max_output_tokens": max_output_tokens}
+
+        async def call(stats: HealthStats) -> T:
+            backend = stats.key[1]
+            # Parsing counts as part of the call: a backend that answers with
+            # unusable output is as bad as one that errors.
+            result = parse(
+                await _GENERATORS[backend](prompts[backend], **options)
+            )
+            metrics.increment("llm_backend", f"{task}:{backend}")
+            return result
+
+        # A losing hedge keeps its pool thread until the backend times out,
+        # so only hedge into a pool with room left.
+        return await self._race.run(
+            self._candidates(task, prompts),
+            call,
+            lambda stats: not backend_saturated(stats.key[1])
+        )
+
+    def generate_sync(
+        self,
+        task: str,
+        prompt: Any,
+        parse: Callable[[str], T] = str.strip,
+        backends: Iterable[str] | None = None,
+        schema: dict[str, Any] | None = None,
+        max_output_tokens: int | None = None
+    ) -> T:
+        prompts = self._prompts(prompt, backends)
+        options = {"schema": schema, "max_output_tokens": max_output_tokens}
+        last_error: Exception | None = None
+
+        for stats in self._candidates(task, prompts):
+            backend = stats.key[1]
+            try:
+                result = self._race.attempt_sync(
+                    stats,
+                    lambda: parse(
+                        _SYNC_GENERATORS[backend](prompts[backend], **options)
+                    )
+                )
+            except Exception as exc:
+                last_error = exc
+                continue
+            metrics.increment("llm_backend", f"{task}:{backend}")
+            return result
+
+        raise last_error
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._race.lock:
+            return [
+                {"task": task, "backend": backend, **stats.snapshot()}
+                for (task, backend), stats in self._stats.items()
+            ]
+
+
+llm_router = LLMRouter()
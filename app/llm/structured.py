@@ -0,0 +1,70 @@
+import json
+import re
+from typing import Any
+
+_FENCE = re.compile(r"^\s*```(?:json)?|```\s*$")
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+
+class LLMResponseError(ValueError):
+    pass
+
+
+def validate(value: Any, schema: dict[str, Any], path: str = "$"):
+    expected = schema.get("type")
+    if expected:
+        if expected == "integer" and isinstance(value, float):
+            valid = value.is_integer()
+        else:
+            valid = isinstance(value, _JSON_TYPES[expected]) and not (
+                isinstance(value, bool) and expected in ("integer", "number")
+            )
+        if not valid:
+            raise LLMResponseError(f"{path}: expected {expected}")
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise LLMResponseError(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                raise LLMResponseError(f"{path}: missing {key}")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                validate(value[key], subschema, f"{path}.{key}")
+
+    if isinstance(value, list) and "items" in schema:
+        for index, item in enumerate(value):
+            validate(item, schema["items"], f"{path}[{index}]")
+
+
+def parse_json(raw: str, schema: dict[str, Any] | None = None) -> Any:
+    # JSON mode answers are bare JSON; the fence and brace handling is for
+    # backends that still wrap it in markdown or prose.
+    text = _FENCE.sub("", raw).strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        start = min(
+            (i for i in (text.find("{"), text.find("[")) if i >= 0),
+            default=-1
+        )
+        end = max(text.rfind("}"), text.rfind("]"))
+        if start < 0 or end <= start:
+            raise LLMResponseError("No JSON found in LLM response")
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as exc:
+            raise LLMResponseError(f"Malformed JSON from LLM: {exc}") from exc
+
+    if schema:
+        validate(data, schema)
+    return data
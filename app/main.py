@@ -1,9 +1,17 @@
 from fastapi import FastAPI, UploadFile, File, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import json
+from starlette.middleware.gzip import (
+    DEFAULT_EXCLUDED_CONTENT_TYPES,
+    GZipMiddleware,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
 from sqlalchemy.orm import Session
 
 from app.controllers.detect_controller import DetectController
+from app.controllers.gemini_service_interval_controller import (
+    GeminiServiceIntervalController
+)
 from app.controllers.service_center_controller import ServiceCenterController
 from app.controllers.model_catalog_controller import ModelCatalogController
 from app.controllers.reminder_controller import ReminderController
@@ -12,22 +20,47 @@ from app.controllers.google_calendar_controller import GoogleCalendarController
 from app.voice.router import router as voice_router
 from app.models.reminder_model import Reminder
 from app.models.todo_model import TodoCreate, TodoUpdate
+from app.models.service_date_model import ServiceDateBatchRequest
 from app.models.google_oauth_token_orm import GoogleOAuthTokenORM
 from app.models.calendar_event_sync_orm import CalendarEventSyncORM
 from app.models.todo_orm import TodoORM
+from app.models.llm_cache_orm import LLMCacheORM
+from app.models.detection_cache_orm import DetectionCacheORM
+from app.models.overpass_tile_orm import OverpassTileORM
+from app.models.osm_poi_orm import OsmPoiORM
+from app.models.osm_region_orm import OsmRegionORM
+from app.models.model_catalog_orm import ModelCatalogORM
+from app.models.catalog_item_orm import CatalogItemORM
+from app.models.service_interval_orm import ServiceIntervalORM
 from uuid import UUID
 
 
 from datetime import date
-from app.utils.service_date_calculator import calculate_next_service_date_llm
+from app.utils.service_date_calculator import (
+    calculate_next_service_date_llm,
+    calculate_next_service_dates_llm,
+)
 from app.db import Base, engine, get_db
 
 from app.scheduler import start_scheduler
+from app.utils.background import run_in_background
+from app.utils.image_ingest import UploadTooLargeError
+from app.utils.local_classifier import get_local_classifier
+from app.utils.metrics import metrics
+from app.utils.model_catalog_store import MODEL_CATALOG_PREWARM_ON_STARTUP
+from app.utils.overpass_pool import overpass_pool
+from app.utils.place_format import parse_fields
+from app.utils.service_intervals import service_interval_table
+from app.utils.responses import FastJSONResponse
+from app.llm import llm_router, shutdown as shutdown_llm
+from app.utils.http_client import close_http_client
 
 Base.metadata.create_all(bind=engine)
 
 _scheduler = None
 
+SERVICE_DATE_BATCH_MAX_ITEMS = 50
+
 app = FastAPI(
     title="Smart Appliance AI",
     description="Gemini Vision ??? LLaVA-guided OpenStreetMap service center discovery",
@@ -41,6 +74,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# NDJSON streams are left uncompressed so each line is flushed as it is
+# produced.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=1000,
+    exclude_content_types=(
+        *DEFAULT_EXCLUDED_CONTENT_TYPES, "application/x-ndjson"
+    )
+)
+
 app.include_router(voice_router)
 
 
@@ -50,10 +93,32 @@ def _start_scheduler():
     _scheduler = start_scheduler()
 
 
+@app.on_event("startup")
+async def _load_local_classifier():
+    await asyncio.to_thread(get_local_classifier)
+
+
+@app.on_event("startup")
+async def _load_service_intervals():
+    await asyncio.to_thread(service_interval_table.load)
+
+
+@app.on_event("startup")
+async def _prewarm_model_catalog():
+    if MODEL_CATALOG_PREWARM_ON_STARTUP:
+        run_in_background(ModelCatalogController.prewarm())
+
+
 @app.on_event("shutdown")
 def _stop_scheduler():
     if _scheduler:
         _scheduler.shutdown()
+    shutdown_llm()
+
+
+@app.on_event("shutdown")
+async def _close_http_client():
+    await close_http_client()
 
 @app.get("/")
 def home():
@@ -63,20 +128,57 @@ def home():
         "message": "Smart Appliance AI is running"
     }
 
+@app.get("/metrics", tags=["Monitoring"])
+def get_metrics():
+    return {
+        **metrics.snapshot(),
+        "overpassEndpoints": overpass_pool.snapshot(),
+        "llmBackends": llm_router.snapshot()
+    }
+
 @app.post("/detect-appliance", tags=["Appliance Detection"])
 async def detect_appliance(image: UploadFile = File(...)):
  
     return await DetectController.detect_appliance(image)
 
+@app.post("/detect-appliance/batch", tags=["Appliance Detection"])
+async def detect_appliance_batch(
+    images: list[UploadFile] = File(...),
+    concurrency: int | None = None
+):
+
+    return StreamingResponse(
+        DetectController.detect_appliance_batch(images, concurrency),
+        media_type="application/x-ndjson"
+    )
+
+def _place_fields(fields: str | None) -> tuple[str, ...]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/find-service-centers", tags=["Service Centers"])
 async def find_service_centers(
     appliance_type: str,
-    brand: str
+    brand: str,
+    lat: float | None = None,
+    lon: float | None = None,
+    radius_m: int = 6000,
+    limit: int = 10,
+    progressive: bool = False,
+    fields: str | None = None
 ):
 
     return await ServiceCenterController.find_service_centers(
         appliance_type=appliance_type,
-        brand=brand
+        brand=brand,
+        user_lat=lat,
+        user_lon=lon,
+        radius_m=radius_m,
+        limit=limit,
+        progressive=progressive,
+        fields=_place_fields(fields)
     )
 
 @app.get("/find-local-services", tags=["Local Services"])
@@ -85,48 +187,105 @@ async def find_local_services(
     lat: float | None = None,
     lon: float | None = None,
     limit_per_category: int = 3,
-    radius_m: int = 6000
+    radius_m: int = 6000,
+    progressive: bool = False,
+    fields: str | None = None
 ):
     return await ServiceCenterController.find_local_services_llm(
         query=query,
         user_lat=lat,
         user_lon=lon,
         limit_per_category=limit_per_category,
-        radius_m=radius_m
+        radius_m=radius_m,
+        progressive=progressive,
+        fields=_place_fields(fields)
     )
 
-@app.post("/detect-appliance-and-centers", tags=["Smart Flow"])
-async def detect_appliance_and_centers(image: UploadFile = File(...)):
- 
-    detection_response = await DetectController.detect_appliance(image)
+@app.get("/find-local-services/stream", tags=["Local Services"])
+async def find_local_services_stream(
+    query: str,
+    lat: float | None = None,
+    lon: float | None = None,
+    limit_per_category: int = 3,
+    radius_m: int = 6000,
+    progressive: bool = False,
+    fields: str | None = None
+):
+    return StreamingResponse(
+        ServiceCenterController.stream_local_services(
+            query=query,
+            user_lat=lat,
+            user_lon=lon,
+            limit_per_category=limit_per_category,
+            radius_m=radius_m,
+            progressive=progressive,
+            fields=_place_fields(fields)
+        ),
+        media_type="application/x-ndjson"
+    )
 
-    if not hasattr(detection_response, "body"):
-        return detection_response
+@app.post("/detect-appliance-and-centers", tags=["Smart Flow"])
+async def detect_appliance_and_centers(
+    image: UploadFile = File(...),
+    lat: float | None = None,
+    lon: float | None = None,
+    radius_m: int = 6000,
+    fields: str | None = None
+):
+    place_fields = _place_fields(fields)
 
-    detected_json = json.loads(detection_response.body)
+    # Overpass is queried for the likely shop types while the image is
+    # still being classified.
+    prefetch = run_in_background(
+        ServiceCenterController.prefetch_service_centers(lat, lon, radius_m)
+    )
 
-    if "error" in detected_json:
-        return detected_json
+    try:
+        detected = await DetectController.detect(image)
+    except UploadTooLargeError as e:
+        return JSONResponse({"error": str(e)}, status_code=413)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
 
-    appliance_type = detected_json.get("applianceType", "")
-    brand = detected_json.get("brand", "")
+    appliance_type = detected.get("applianceType", "")
+    brand = detected.get("brand", "")
 
     if not appliance_type:
         return {
             "error": "Appliance type could not be detected from image"
         }
 
-    centers_response = await ServiceCenterController.find_service_centers(
-        appliance_type=appliance_type,
-        brand=brand
+    # Clients usually ask for models and the service interval next; start
+    # those lookups now so they are answered from the LLM cache. A model
+    # list without a brand is useless, so that prefetch needs both.
+    if brand:
+        run_in_background(
+            ModelCatalogController.get_models(appliance_type, brand)
+        )
+    run_in_background(
+        GeminiServiceIntervalController.get_service_interval_months(
+            appliance_type, brand
+        )
     )
 
-    centers_json = json.loads(centers_response.body)
-
-    return {
-        "applianceDetection": detected_json,
-        "serviceCenters": centers_json.get("serviceCenters", [])
-    }
+    await asyncio.wait({prefetch})
+
+    try:
+        centers = await ServiceCenterController.search_service_centers(
+            appliance_type=appliance_type,
+            brand=brand,
+            user_lat=lat,
+            user_lon=lon,
+            radius_m=radius_m,
+            fields=place_fields
+        )
+    except Exception:
+        centers = {}
+
+    return FastJSONResponse({
+        "applianceDetection": detected,
+        "serviceCenters": centers.get("serviceCenters", [])
+    })
 
 @app.get("/get-models", tags=["Models"])
 async def get_models(
@@ -134,11 +293,26 @@ async def get_models(
     brand: str
 ):
 
-    return ModelCatalogController.get_models(
+    return await ModelCatalogController.get_models(
         appliance_type=appliance_type,
         brand=brand
     )
 
+@app.get("/models/search", tags=["Models"])
+def search_models(
+    q: str,
+    appliance_type: str | None = None,
+    brand: str | None = None,
+    limit: int = 10
+):
+
+    return ModelCatalogController.search_models(
+        query=q,
+        appliance_type=appliance_type,
+        brand=brand,
+        limit=limit
+    )
+
 
 @app.post("/reminders", tags=["Reminders"])
 async def create_reminder(
@@ -233,11 +407,13 @@ async def google_oauth_start():
     return GoogleCalendarController.get_auth_url()
 
 @app.get("/google/oauth/callback", tags=["Google Calendar"])
-async def google_oauth_callback(code: str, db: Session = Depends(get_db)):
+def google_oauth_callback(code: str, db: Session = Depends(get_db)):
     return GoogleCalendarController.handle_oauth_callback(code, db)
 
+# Plain def: the sync makes blocking Calendar and LLM calls per event, so it
+# runs in the threadpool instead of on the event loop.
 @app.post("/google/sync", tags=["Google Calendar"])
-async def google_sync(db: Session = Depends(get_db)):
+def google_sync(db: Session = Depends(get_db)):
     return GoogleCalendarController.sync_all_calendars(db)
 
 @app.post("/calculate-service-date-llm", tags=["Service Reminder (AI)"])
@@ -257,7 +433,7 @@ async def calculate_service_date_llm(
 
     base_date = purchaseDate if isNew else lastServiceDate
 
-    result = calculate_next_service_date_llm(
+    result = await calculate_next_service_date_llm(
         appliance_type=applianceType,
         base_date=base_date,
         brand=brand,
@@ -273,3 +449,49 @@ async def calculate_service_date_llm(
     }
 
 
+@app.post("/calculate-service-date-llm/batch", tags=["Service Reminder (AI)"])
+async def calculate_service_date_llm_batch(batch: ServiceDateBatchRequest):
+    if len(batch.appliances) > SERVICE_DATE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {SERVICE_DATE_BATCH_MAX_ITEMS} appliances per batch"
+        )
+
+    results: list[dict] = []
+    valid = []
+
+    for index, item in enumerate(batch.appliances):
+        result = {"index": index, "applianceType": item.applianceType}
+        results.append(result)
+
+        if item.isNew and not item.purchaseDate:
+            result["error"] = "purchaseDate is required for new appliance"
+            continue
+
+        if not item.isNew and not item.lastServiceDate:
+            result["error"] = "lastServiceDate is required for old appliance"
+            continue
+
+        result["baseDate"] = (
+            item.purchaseDate if item.isNew else item.lastServiceDate
+        )
+        valid.append((result, {
+            "appliance_type": item.applianceType,
+            "base_date": result["baseDate"],
+            "brand": item.brand,
+            "model": item.model
+        }))
+
+    calculated = await calculate_next_service_dates_llm(
+        [appliance for _, appliance in valid]
+    )
+
+    for (result, _), next_service in zip(valid, calculated):
+        if not next_service:
+            result["error"] = "Service interval could not be determined"
+            continue
+        result["suggestedIntervalMonths"] = next_service["intervalMonths"]
+        result["reason"] = next_service["reason"]
+        result["nextServiceDate"] = next_service["nextServiceDate"]
+
+    return {"results": results}
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Float, Integer, String, UniqueConstraint
+
+from app.db import Base
+
+
+class CatalogItemORM(Base):
+    __tablename__ = "catalog_items"
+    __table_args__ = (
+        UniqueConstraint(
+            "appliance_type", "brand", "model_name", name="uq_catalog_item"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    appliance_type = Column(String, nullable=False, index=True)
+    brand = Column(String, nullable=False, index=True)
+    model_name = Column(String, nullable=False)
+    capacity = Column(String)
+    type = Column(String)
+    source = Column(String, nullable=False)
+    updated_at = Column(Float, nullable=False)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Float, Integer, String, Text
+
+from app.db import Base
+
+
+class DetectionCacheORM(Base):
+    __tablename__ = "detection_cache"
+
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)
+    perceptual_hash = Column(String(16), nullable=False)
+    result_json = Column(Text, nullable=False)
+    confidence = Column(Float, nullable=False, default=0.0)
+    created_at = Column(Float, nullable=False)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Float, Integer, String, Text
+
+from app.db import Base
+
+
+class LLMCacheORM(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)
+    site = Column(String, nullable=False, index=True)
+    value_json = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False, default=0)
+    created_at = Column(Float, nullable=False)
+    expires_at = Column(Float, nullable=False, index=True)
+    last_access = Column(Float, nullable=False, index=True)
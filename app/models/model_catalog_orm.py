@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Float, Integer, String, Text, UniqueConstraint
+
+from app.db import Base
+
+
+class ModelCatalogORM(Base):
+    __tablename__ = "model_catalog"
+    __table_args__ = (
+        UniqueConstraint("appliance_type", "brand", name="uq_catalog_pair"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    appliance_type = Column(String, nullable=False)
+    brand = Column(String, nullable=False)
+    models_json = Column(Text, nullable=False)
+    fetched_at = Column(Float, nullable=False)
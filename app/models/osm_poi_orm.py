@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Float, String, Text
+
+from app.db import Base
+
+
+class OsmPoiORM(Base):
+    __tablename__ = "osm_pois"
+
+    id = Column(String, primary_key=True)
+    tile = Column(String(12), nullable=False, index=True)
+    lat = Column(Float, nullable=False)
+    lon = Column(Float, nullable=False)
+    name = Column(String, nullable=True)
+    shop = Column(String, nullable=True, index=True)
+    amenity = Column(String, nullable=True, index=True)
+    office = Column(String, nullable=True, index=True)
+    craft = Column(String, nullable=True, index=True)
+    tourism = Column(String, nullable=True, index=True)
+    leisure = Column(String, nullable=True, index=True)
+    healthcare = Column(String, nullable=True, index=True)
+    tags_json = Column(Text, nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Float, Integer, String
+
+from app.db import Base
+
+
+class OsmRegionORM(Base):
+    __tablename__ = "osm_regions"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)
+    south = Column(Float, nullable=False)
+    west = Column(Float, nullable=False)
+    north = Column(Float, nullable=False)
+    east = Column(Float, nullable=False)
+    poi_count = Column(Integer, nullable=False, default=0)
+    imported_at = Column(Float, nullable=False)
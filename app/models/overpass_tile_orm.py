@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Float, Integer, String, Text, UniqueConstraint
+
+from app.db import Base
+
+
+class OverpassTileORM(Base):
+    __tablename__ = "overpass_tiles"
+    __table_args__ = (
+        UniqueConstraint("tile", "tag_key", "tag_value", name="uq_tile_tag"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    tile = Column(String(12), nullable=False, index=True)
+    tag_key = Column(String, nullable=False)
+    tag_value = Column(String, nullable=False)
+    elements_json = Column(Text, nullable=False)
+    fetched_at = Column(Float, nullable=False)
@@ -0,0 +1,17 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ServiceDateRequest(BaseModel):
+    applianceType: str
+    isNew: bool
+    purchaseDate: Optional[date] = None
+    lastServiceDate: Optional[date] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+
+
+class ServiceDateBatchRequest(BaseModel):
+    appliances: list[ServiceDateRequest]
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Float, Integer, String, UniqueConstraint
+
+from app.db import Base
+
+
+class ServiceIntervalORM(Base):
+    __tablename__ = "service_intervals"
+    __table_args__ = (
+        UniqueConstraint(
+            "appliance_type", "brand", "model", name="uq_service_interval"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    appliance_type = Column(String, nullable=False)
+    brand = Column(String, nullable=False, default="")
+    model = Column(String, nullable=False, default="")
+    interval_months = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)
+    source = Column(String, nullable=False)
+    updated_at = Column(Float, nullable=False)
@@ -0,0 +1,23 @@
+# The one alias table for appliance names; service intervals and local
+# search plans both normalize through it.
+APPLIANCE_ALIASES = {
+    "ac": "air conditioner",
+    "aircon": "air conditioner",
+    "split ac": "air conditioner",
+    "window ac": "air conditioner",
+    "fridge": "refrigerator",
+    "washer": "washing machine",
+    "tv": "television",
+    "telly": "television",
+    "microwave oven": "microwave",
+    "ro": "water purifier",
+    "ro purifier": "water purifier",
+    "geyser": "water heater",
+    "bike": "motorcycle",
+    "scooter": "motorcycle",
+}
+
+
+def normalize_appliance(appliance_type: str) -> str:
+    normalized = " ".join(appliance_type.lower().split())
+    return APPLIANCE_ALIASES.get(normalized, normalized)
@@ -0,0 +1,21 @@
+import asyncio
+from typing import Any, Coroutine
+
+from app.utils.metrics import metrics
+
+# Strong references so fire-and-forget tasks are not garbage collected
+# before they finish.
+_tasks: set[asyncio.Task] = set()
+
+
+def _finished(task: asyncio.Task):
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        metrics.increment("background_task", "error")
+
+
+def run_in_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_finished)
+    return task
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.db import SessionLocal
+from app.models.detection_cache_orm import DetectionCacheORM
+from app.utils.image_hash import hamming_distance
+
+DETECT_CACHE_MAX_ENTRIES = int(os.getenv("DETECT_CACHE_MAX_ENTRIES", "10000"))
+DETECT_CACHE_MAX_DISTANCE = int(os.getenv("DETECT_CACHE_MAX_DISTANCE", "6"))
+DETECT_CACHE_MIN_CONFIDENCE = float(
+    os.getenv("DETECT_CACHE_MIN_CONFIDENCE", "0.5")
+)
+DETECT_CACHE_PRUNE_EVERY = 100
+PHASH_BITS = 64
+
+
+class DetectionCache:
+
+    def __init__(
+        self,
+        max_entries: int = DETECT_CACHE_MAX_ENTRIES,
+        max_distance: int = DETECT_CACHE_MAX_DISTANCE,
+        min_confidence: float = DETECT_CACHE_MIN_CONFIDENCE
+    ):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.min_confidence = min_confidence
+        # content hash -> (perceptual hash, confidence, result)
+        self._entries: OrderedDict[str, tuple[int, float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        # Pigeonhole bucketing: split the hash into max_distance + 1 bands.
+        # Two hashes within max_distance bits must agree on at least one
+        # whole band, so only entries sharing a band value are compared.
+        bands = min(max_distance + 1, PHASH_BITS)
+        widths = [PHASH_BITS // bands + (i < PHASH_BITS % bands)
+                  for i in range(bands)]
+        self._bands = []
+        shift = 0
+        for width in widths:
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+        self._buckets: dict[tuple[int, int], set[str]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._writes = 0
+
+    def _band_keys(self, phash: int) -> list[tuple[int, int]]:
+        return [
+            (band, (phash >> shift) & mask)
+            for band, (shift, mask) in enumerate(self._bands)
+        ]
+
+    def _index(self, digest: str, phash: int):
+        for key in self._band_keys(phash):
+            self._buckets.setdefault(key, set()).add(digest)
+
+    def _unindex(self, digest: str, phash: int):
+        for key in self._band_keys(phash):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(digest)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _put_locked(
+        self,
+        digest: str,
+        phash: int,
+        confidence: float,
+        result: dict[str, Any]
+    ):
+        previous = self._entries.get(digest)
+        if previous:
+            self._unindex(digest, previous[0])
+        self._entries[digest] = (phash, confidence, result)
+        self._entries.move_to_end(digest)
+        self._index(digest, phash)
+        while len(self._entries) > self.max_entries:
+            evicted, (evicted_phash, _, _) = self._entries.popitem(last=False)
+            self._unindex(evicted, evicted_phash)
+
+    def _load(self):
+        db = SessionLocal()
+        try:
+            records = (
+                db.query(DetectionCacheORM)
+                .order_by(DetectionCacheORM.created_at.desc())
+                .limit(self.max_entries)
+                .all()
+            )
+            entries = [
+                (
+                    record.content_hash,
+                    int(record.perceptual_hash, 16),
+                    record.confidence,
+                    json.loads(record.result_json)
+                )
+                for record in reversed(records)
+            ]
+        finally:
+            db.close()
+
+        with self._lock:
+            for digest, phash, confidence, result in entries:
+                if digest not in self._entries:
+                    self._put_locked(digest, phash, confidence, result)
+            self._loaded = True
+
+    def _remember(
+        self,
+        digest: str,
+        phash: int,
+        confidence: float,
+        result: dict[str, Any]
+    ):
+        with self._lock:
+            self._put_locked(digest, phash, confidence, result)
+
+    def lookup(self, digest: str, phash: int) -> dict[str, Any] | None:
+        if not self._loaded:
+            self._load()
+
+        with self._lock:
+            exact = self._entries.get(digest)
+            if exact:
+                self._entries.move_to_end(digest)
+                return exact[2]
+
+            candidates = set()
+            for key in self._band_keys(phash):
+                candidates |= self._buckets.get(key, set())
+
+            best = None
+            best_distance = self.max_distance + 1
+            for candidate_digest in candidates:
+                candidate, confidence, result = self._entries[candidate_digest]
+                if confidence < self.min_confidence:
+                    continue
+                distance = hamming_distance(phash, candidate)
+                if distance < best_distance:
+                    best, best_distance = result, distance
+            return best
+
+    def store(self, digest: str, phash: int, result: dict[str, Any]):
+        confidence = float(result.get("confidence") or 0.0)
+        self._remember(digest, phash, confidence, result)
+
+        db = SessionLocal()
+        try:
+            record = (
+                db.query(DetectionCacheORM)
+                .filter(DetectionCacheORM.content_hash == digest)
+                .first()
+            )
+            if not record:
+                record = DetectionCacheORM(content_hash=digest)
+                db.add(record)
+            record.perceptual_hash = f"{phash:016x}"
+            record.result_json = json.dumps(result)
+            record.confidence = confidence
+            record.created_at = time.time()
+            db.commit()
+
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % DETECT_CACHE_PRUNE_EVERY == 0
+            if prune:
+                self._prune(db)
+        finally:
+            db.close()
+
+    def _prune(self, db):
+        cutoff = (
+            db.query(DetectionCacheORM.created_at)
+            .order_by(DetectionCacheORM.created_at.desc())
+            .offset(self.max_entries)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is None:
+            return
+        db.query(DetectionCacheORM).filter(
+            DetectionCacheORM.created_at <= cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+
+
+detection_cache = DetectionCache()
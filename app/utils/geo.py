@@ -0,0 +1,120 @@
+import math
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE_LAT = 111320.0
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+BBox = tuple[float, float, float, float]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def geohash_encode(lat: float, lon: float, precision: int) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if lon >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> tuple[float, float]:
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def geohash_bbox(geohash: str) -> BBox:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+    return lat_range[0], lon_range[0], lat_range[1], lon_range[1]
+
+
+def radius_bbox(lat: float, lon: float, radius_m: float) -> BBox:
+    d_lat = radius_m / METERS_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    d_lon = radius_m / (METERS_PER_DEGREE_LAT * cos_lat)
+    return lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon
+
+
+def covering_geohashes(
+    lat: float,
+    lon: float,
+    radius_m: float,
+    precision: int
+) -> list[str]:
+    south, west, north, east = radius_bbox(lat, lon, radius_m)
+    cell_lat, cell_lon = geohash_cell_size(precision)
+
+    tiles = []
+    row = math.floor(south / cell_lat) * cell_lat
+    while row < north:
+        col = math.floor(west / cell_lon) * cell_lon
+        while col < east:
+            tile = geohash_encode(
+                min(max(row + cell_lat / 2, -90.0), 90.0),
+                ((col + cell_lon / 2 + 180.0) % 360.0) - 180.0,
+                precision
+            )
+            if tile not in tiles:
+                tiles.append(tile)
+            col += cell_lon
+        row += cell_lat
+    return tiles
+
+
+def merge_bboxes(bboxes: list[BBox]) -> BBox:
+    return (
+        min(b[0] for b in bboxes),
+        min(b[1] for b in bboxes),
+        max(b[2] for b in bboxes),
+        max(b[3] for b in bboxes),
+    )
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class HealthStats:
+
+    def __init__(
+        self,
+        key: Any,
+        breaker_failures: int,
+        breaker_cooldown_s: float,
+        ewma_alpha: float = 0.3,
+        weight: float = 1.0
+    ):
+        self.key = key
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown_s = breaker_cooldown_s
+        self.ewma_alpha = ewma_alpha
+        self.weight = weight
+        self.latency_s: float | None = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.half_open_probe = False
+
+    def available(self, now: float) -> bool:
+        if self.opened_at is None:
+            return True
+        if now - self.opened_at < self.breaker_cooldown_s:
+            return False
+        # Half-open: let a single probe through after the cooldown.
+        return not self.half_open_probe
+
+    def rank(self) -> tuple[float, float]:
+        # Healthy and fast first; targets without samples rank as fast so
+        # their latency gets measured. Latency is divided by the weight.
+        latency = self.latency_s if self.latency_s is not None else 0.0
+        return round(self.error_rate, 1), latency / self.weight
+
+    def record_latency(self, latency_s: float):
+        if self.latency_s is None:
+            self.latency_s = latency_s
+        else:
+            self.latency_s += self.ewma_alpha * (latency_s - self.latency_s)
+
+    def record_success(self, latency_s: float):
+        self.record_latency(latency_s)
+        self.error_rate *= 1 - self.ewma_alpha
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.half_open_probe = False
+
+    def record_failure(self, now: float):
+        self.error_rate += self.ewma_alpha * (1 - self.error_rate)
+        self.consecutive_failures += 1
+        self.half_open_probe = False
+        if self.consecutive_failures >= self.breaker_failures:
+            self.opened_at = now
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "latencyMs": (
+                round(self.latency_s * 1000) if self.latency_s is not None
+                else None
+            ),
+            "errorRate": round(self.error_rate, 3),
+            "circuitOpen": self.opened_at is not None
+        }
+
+
+class HedgedRace:
+
+    def __init__(
+        self,
+        metric: str,
+        hedge_delay_s: float,
+        fallback_label: str = "fallback"
+    ):
+        self.metric = metric
+        self.hedge_delay_s = hedge_delay_s
+        self.fallback_label = fallback_label
+        self.lock = threading.Lock()
+
+    def ranked(
+        self,
+        stats: list[HealthStats],
+        include_open: bool = False
+    ) -> list[HealthStats]:
+        now = time.monotonic()
+        with self.lock:
+            available = [s for s in stats if s.available(now)]
+        if not available and include_open:
+            available = list(stats)
+        return sorted(available, key=HealthStats.rank)
+
+    def claim(self, stats: HealthStats):
+        with self.lock:
+            if stats.opened_at is not None:
+                stats.half_open_probe = True
+
+    def _finish(self, stats: HealthStats, started: float, ok: bool):
+        now = time.monotonic()
+        with self.lock:
+            if ok:
+                stats.record_success(now - started)
+            else:
+                stats.record_failure(now)
+
+    async def attempt(
+        self,
+        stats: HealthStats,
+        call: Callable[[], Awaitable[T]]
+    ) -> T:
+        started = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            # Lost a hedge race: the elapsed time is a lower bound on its
+            # latency, which keeps slow targets from staying preferred.
+            with self.lock:
+                stats.half_open_probe = False
+                stats.record_latency(time.monotonic() - started)
+            raise
+        except Exception:
+            self._finish(stats, started, ok=False)
+            raise
+        self._finish(stats, started, ok=True)
+        return result
+
+    def attempt_sync(self, stats: HealthStats, call: Callable[[], T]) -> T:
+        self.claim(stats)
+        started = time.monotonic()
+        try:
+            result = call()
+        except Exception:
+            self._finish(stats, started, ok=False)
+            raise
+        self._finish(stats, started, ok=True)
+        return result
+
+    async def run(
+        self,
+        candidates: list[HealthStats],
+        call: Callable[[HealthStats], Awaitable[T]],
+        can_hedge: Callable[[HealthStats], bool] = lambda stats: True
+    ) -> T:
+        remaining = list(candidates)
+        tasks: dict[asyncio.Task, HealthStats] = {}
+        last_error: Exception | None = None
+        hedging = self.hedge_delay_s > 0
+
+        def launch():
+            stats = remaining.pop(0)
+            self.claim(stats)
+            task = asyncio.create_task(
+                self.attempt(stats, lambda: call(stats))
+            )
+            tasks[task] = stats
+
+        launch()
+        try:
+            while tasks:
+                hedge = remaining and hedging
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=self.hedge_delay_s if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if can_hedge(remaining[0]):
+                        metrics.increment(self.metric, "hedged")
+                        launch()
+                    else:
+                        metrics.increment(self.metric, "hedge_skipped")
+                        hedging = False
+                    continue
+
+                for task in done:
+                    del tasks[task]
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+
+                if not tasks and remaining:
+                    metrics.increment(self.metric, self.fallback_label)
+                    launch()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        raise last_error
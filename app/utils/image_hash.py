@@ -0,0 +1,23 @@
+from PIL import Image
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    # Difference hash: compare horizontally adjacent pixels of a tiny
+    # grayscale thumbnail, robust to rescaling and re-encoding.
+    small = image.convert("L").resize(
+        (hash_size + 1, hash_size),
+        Image.Resampling.LANCZOS
+    )
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value <<= 1
+            if pixels[offset + col] > pixels[offset + col + 1]:
+                value |= 1
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from PIL import Image, ImageOps
+
+DETECT_MAX_UPLOAD_BYTES = int(
+    os.getenv("DETECT_MAX_UPLOAD_BYTES", str(15 * 1024 * 1024))
+)
+DETECT_IMAGE_MAX_SIDE = int(os.getenv("DETECT_IMAGE_MAX_SIDE", "1024"))
+DETECT_IMAGE_QUALITY = int(os.getenv("DETECT_IMAGE_QUALITY", "80"))
+DETECT_IMAGE_FORMAT = os.getenv("DETECT_IMAGE_FORMAT", "JPEG").upper()
+
+UPLOAD_CHUNK_BYTES = 256 * 1024
+UPLOAD_SPOOL_BYTES = 1024 * 1024
+
+_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+@dataclass
+class IngestedImage:
+    content_hash: str
+    image: Image.Image
+    data: bytes
+    mime_type: str
+    original_size: tuple[int, int]
+    upload_bytes: int
+
+    def as_llm_part(self) -> dict:
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+async def spool_upload(
+    upload: UploadFile,
+    max_bytes: int = DETECT_MAX_UPLOAD_BYTES
+) -> tuple[BinaryIO, str, int]:
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    digest = hashlib.sha256()
+    total = 0
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLargeError(
+                    f"Image exceeds {max_bytes} byte upload limit"
+                )
+            digest.update(chunk)
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+
+    if total == 0:
+        spool.close()
+        raise ValueError("Empty image upload")
+
+    spool.seek(0)
+    return spool, digest.hexdigest(), total
+
+
+def prepare_image(
+    source: BinaryIO,
+    max_side: int = DETECT_IMAGE_MAX_SIDE,
+    quality: int = DETECT_IMAGE_QUALITY,
+    image_format: str = DETECT_IMAGE_FORMAT
+) -> tuple[Image.Image, bytes, tuple[int, int]]:
+    with Image.open(source) as img:
+        original_size = img.size
+        # JPEG decoders can scale by 1/2, 1/4 or 1/8 while decoding, so the
+        # full-resolution bitmap is never materialized.
+        img.draft("RGB", (max_side, max_side))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_side, max_side), reducing_gap=2.0)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format, quality=quality, optimize=True)
+    return img, buffer.getvalue(), original_size
+
+
+async def ingest_upload(
+    upload: UploadFile,
+    max_bytes: int = DETECT_MAX_UPLOAD_BYTES,
+    max_side: int = DETECT_IMAGE_MAX_SIDE,
+    quality: int = DETECT_IMAGE_QUALITY,
+    image_format: str = DETECT_IMAGE_FORMAT
+) -> IngestedImage:
+    spool, digest, total = await spool_upload(upload, max_bytes)
+    try:
+        img, data, original_size = await asyncio.to_thread(
+            prepare_image, spool, max_side, quality, image_format
+        )
+    finally:
+        spool.close()
+
+    return IngestedImage(
+        content_hash=digest,
+        image=img,
+        data=data,
+        mime_type=_MIME_TYPES.get(image_format, "image/jpeg"),
+        original_size=original_size,
+        upload_bytes=total
+    )
@@ -0,0 +1,95 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Protocol
+
+import numpy as np
+from PIL import Image
+
+LOCAL_CLASSIFIER_PATH = os.getenv("LOCAL_CLASSIFIER_PATH", "")
+LOCAL_CLASSIFIER_LABELS = os.getenv("LOCAL_CLASSIFIER_LABELS", "")
+LOCAL_CLASSIFIER_THRESHOLD = float(
+    os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.85")
+)
+LOCAL_CLASSIFIER_INPUT_SIZE = int(
+    os.getenv("LOCAL_CLASSIFIER_INPUT_SIZE", "224")
+)
+
+logger = logging.getLogger(__name__)
+
+_IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+class ApplianceClassifier(Protocol):
+
+    def classify(self, image: Image.Image) -> tuple[str, float]:
+        ...
+
+
+class OnnxApplianceClassifier:
+
+    def __init__(
+        self,
+        model_path: str,
+        labels: list[str],
+        input_size: int = LOCAL_CLASSIFIER_INPUT_SIZE
+    ):
+        try:
+            import onnxruntime
+        except ImportError as exc:
+            raise RuntimeError("onnxruntime is not installed") from exc
+
+        self.session = onnxruntime.InferenceSession(
+            model_path,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.labels = labels
+        self.input_size = input_size
+
+    def _preprocess(self, image: Image.Image) -> np.ndarray:
+        resized = image.convert("RGB").resize(
+            (self.input_size, self.input_size),
+            Image.Resampling.BILINEAR
+        )
+        pixels = np.asarray(resized, dtype=np.float32) / 255.0
+        pixels = (pixels - _IMAGENET_MEAN) / _IMAGENET_STD
+        return pixels.transpose(2, 0, 1)[np.newaxis, ...]
+
+    def classify(self, image: Image.Image) -> tuple[str, float]:
+        logits = self.session.run(
+            None, {self.input_name: self._preprocess(image)}
+        )[0][0]
+        exp = np.exp(logits - np.max(logits))
+        probs = exp / exp.sum()
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+
+def _load_labels(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip()]
+
+
+@lru_cache(maxsize=1)
+def get_local_classifier() -> ApplianceClassifier | None:
+    if not LOCAL_CLASSIFIER_PATH:
+        return None
+
+    labels_path = LOCAL_CLASSIFIER_LABELS or (
+        os.path.splitext(LOCAL_CLASSIFIER_PATH)[0] + ".labels.txt"
+    )
+    try:
+        return OnnxApplianceClassifier(
+            LOCAL_CLASSIFIER_PATH,
+            _load_labels(labels_path)
+        )
+    except Exception:
+        # Cached as unavailable: detection falls through to the LLM tier
+        # instead of retrying a broken model load on every request.
+        logger.exception(
+            "Local classifier %s could not be loaded; disabling it",
+            LOCAL_CLASSIFIER_PATH
+        )
+        return None
@@ -0,0 +1,271 @@
+import re
+from typing import Any
+
+from app.utils.appliances import APPLIANCE_ALIASES
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "any", "around", "at", "best", "by", "center", "centre",
+    "close", "find", "for", "get", "good", "i", "in", "me", "my", "near",
+    "nearby", "nearest", "need", "of", "on", "open", "place", "places",
+    "please", "shop", "shops", "some", "store", "stores", "the", "to", "want",
+    "where", "with"
+}
+
+# Applied per token before stemming; values may expand to several tokens.
+# Single-word appliance aliases come from the shared appliance table.
+SYNONYMS = {
+    **{
+        alias: name for alias, name in APPLIANCE_ALIASES.items()
+        if " " not in alias
+    },
+    "phone": "mobile",
+    "cellphone": "mobile",
+    "smartphone": "mobile",
+    "chemist": "pharmacy",
+    "drugstore": "pharmacy",
+    "medical": "pharmacy",
+    "medicine": "pharmacy",
+    "supermarket": "grocery",
+    "kirana": "grocery",
+    "vegetables": "grocery",
+    "petrol": "fuel",
+    "diesel": "fuel",
+    "gas": "fuel",
+    "mechanic": "car repair",
+    "garage": "car repair",
+    "fix": "repair",
+    "fixing": "repair",
+    "service": "repair",
+    "servicing": "repair",
+    "restaurant": "food",
+    "eatery": "food",
+    "coffee": "cafe",
+    "doctor": "clinic",
+    "plumbing": "plumber",
+    "electrical": "electrician",
+    "laundromat": "laundry",
+    "washing": "laundry",
+    "cash": "atm",
+}
+
+
+def _stem(token: str) -> str:
+    if len(token) <= 3:
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("ing") and len(token) > 5:
+        return token[:-3]
+    if token.endswith(("sses", "shes", "ches", "xes")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+# Multi-word names are matched as phrases before any per-token synonym, so
+# "washing machine" never turns into "laundry machine" and "split ac" still
+# resolves. Canonical names map to themselves.
+PHRASES = {
+    tuple(alias.split()): name
+    for alias, name in APPLIANCE_ALIASES.items() if " " in alias
+}
+for _name in [*APPLIANCE_ALIASES.values(), *SYNONYMS.values()]:
+    if " " in _name:
+        PHRASES.setdefault(tuple(_name.split()), _name)
+_MAX_PHRASE = max(map(len, PHRASES), default=1)
+
+
+def _canonical_word(token: str) -> list[str]:
+    word = token
+    # Stem and map until nothing changes, so "washers", "washer" and
+    # "washing machine" all land on the same words.
+    for _ in range(4):
+        if word in STOPWORDS:
+            return []
+        mapped = SYNONYMS.get(word)
+        if mapped and " " in mapped:
+            return mapped.split()
+        if mapped and mapped != word:
+            word = mapped
+            continue
+        stemmed = _stem(word)
+        if stemmed == word:
+            break
+        word = stemmed
+    return [word]
+
+
+def normalize_query(query: str) -> str:
+    raw = _TOKEN.findall(query.lower())
+    words = []
+    i = 0
+    while i < len(raw):
+        for size in range(min(_MAX_PHRASE, len(raw) - i), 1, -1):
+            phrase = PHRASES.get(tuple(raw[i:i + size]))
+            if phrase:
+                words.extend(phrase.split())
+                i += size
+                break
+        else:
+            words.extend(_canonical_word(raw[i]))
+            i += 1
+    # Sorted and de-duplicated so "repair ac" and "AC repairs near me" share
+    # one plan.
+    return " ".join(sorted(set(words)))
+
+
+def _category(
+    label: str,
+    priority: str,
+    *tags: tuple[str, str]
+) -> dict[str, Any]:
+    return {
+        "label": label,
+        "priority": priority,
+        "osmTags": [{"key": key, "value": value} for key, value in tags]
+    }
+
+
+_APPLIANCE_REPAIR = [
+    _category(
+        "appliance repair", "primary",
+        ("shop", "appliance"), ("craft", "electronics_repair"),
+        ("shop", "repair")
+    ),
+    _category("electronics", "related", ("shop", "electronics")),
+    _category("hardware", "related", ("shop", "hardware"))
+]
+
+SEEDED_INTENTS = {
+    "grocery": [
+        _category(
+            "groceries", "primary",
+            ("shop", "supermarket"), ("shop", "convenience"),
+            ("shop", "greengrocer")
+        ),
+        _category("bakery", "related", ("shop", "bakery")),
+        _category("butcher", "related", ("shop", "butcher"))
+    ],
+    "pharmacy": [
+        _category(
+            "pharmacy", "primary",
+            ("amenity", "pharmacy"), ("shop", "chemist")
+        ),
+        _category(
+            "clinic", "related",
+            ("amenity", "clinic"), ("amenity", "doctors")
+        ),
+        _category("hospital", "related", ("amenity", "hospital"))
+    ],
+    "clinic": [
+        _category(
+            "clinic", "primary",
+            ("amenity", "clinic"), ("amenity", "doctors")
+        ),
+        _category("hospital", "related", ("amenity", "hospital")),
+        _category("pharmacy", "related", ("amenity", "pharmacy"))
+    ],
+    "hospital": [
+        _category("hospital", "primary", ("amenity", "hospital")),
+        _category("clinic", "related", ("amenity", "clinic")),
+        _category("pharmacy", "related", ("amenity", "pharmacy"))
+    ],
+    "hardware": [
+        _category(
+            "hardware", "primary",
+            ("shop", "hardware"), ("shop", "doityourself")
+        ),
+        _category("paint", "related", ("shop", "paint")),
+        _category("electrical", "related", ("shop", "electrical"))
+    ],
+    "electronics": [
+        _category("electronics", "primary", ("shop", "electronics")),
+        _category("mobile phones", "related", ("shop", "mobile_phone")),
+        _category("computers", "related", ("shop", "computer"))
+    ],
+    "air conditioner repair": _APPLIANCE_REPAIR,
+    "refrigerator repair": _APPLIANCE_REPAIR,
+    "washing machine repair": _APPLIANCE_REPAIR,
+    "appliance repair": _APPLIANCE_REPAIR,
+    "microwave repair": _APPLIANCE_REPAIR,
+    "tv repair": [
+        _category(
+            "tv repair", "primary",
+            ("craft", "electronics_repair"), ("shop", "electronics")
+        ),
+        _category("appliance repair", "related", ("shop", "appliance"))
+    ],
+    "mobile repair": [
+        _category(
+            "phone repair", "primary",
+            ("shop", "mobile_phone"), ("craft", "electronics_repair")
+        ),
+        _category("electronics", "related", ("shop", "electronics"))
+    ],
+    "car repair": [
+        _category("car repair", "primary", ("shop", "car_repair")),
+        _category("tyres", "related", ("shop", "tyres")),
+        _category("car parts", "related", ("shop", "car_parts")),
+        _category("fuel", "related", ("amenity", "fuel"))
+    ],
+    "motorcycle repair": [
+        _category(
+            "bike repair", "primary",
+            ("shop", "motorcycle_repair"), ("shop", "motorcycle")
+        ),
+        _category("tyres", "related", ("shop", "tyres")),
+        _category("fuel", "related", ("amenity", "fuel"))
+    ],
+    "fuel": [
+        _category("fuel", "primary", ("amenity", "fuel")),
+        _category("car repair", "related", ("shop", "car_repair"))
+    ],
+    "atm": [
+        _category("atm", "primary", ("amenity", "atm")),
+        _category("bank", "related", ("amenity", "bank"))
+    ],
+    "bank": [
+        _category("bank", "primary", ("amenity", "bank")),
+        _category("atm", "related", ("amenity", "atm"))
+    ],
+    "food": [
+        _category(
+            "restaurants", "primary",
+            ("amenity", "restaurant"), ("amenity", "fast_food")
+        ),
+        _category("cafe", "related", ("amenity", "cafe"))
+    ],
+    "cafe": [
+        _category("cafe", "primary", ("amenity", "cafe")),
+        _category("bakery", "related", ("shop", "bakery"))
+    ],
+    "plumber": [
+        _category("plumber", "primary", ("craft", "plumber")),
+        _category("hardware", "related", ("shop", "hardware"))
+    ],
+    "electrician": [
+        _category("electrician", "primary", ("craft", "electrician")),
+        _category("electrical", "related", ("shop", "electrical"))
+    ],
+    "laundry": [
+        _category(
+            "laundry", "primary",
+            ("shop", "laundry"), ("shop", "dry_cleaning")
+        ),
+        _category("tailor", "related", ("craft", "tailor"))
+    ],
+}
+
+# Seed keys are written in plain words; index them the way queries are
+# normalized so both sides always agree.
+_SEEDED_PLANS = {
+    normalize_query(intent): {"categories": categories}
+    for intent, categories in SEEDED_INTENTS.items()
+}
+
+
+def seeded_plan(normalized_query: str) -> dict[str, Any] | None:
+    return _SEEDED_PLANS.get(normalized_query)
@@ -0,0 +1,23 @@
+import threading
+from collections import Counter
+
+
+class Metrics:
+
+    def __init__(self):
+        self._counters: dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, label: str, amount: int = 1):
+        with self._lock:
+            self._counters.setdefault(name, Counter())[label] += amount
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                name: dict(counter)
+                for name, counter in self._counters.items()
+            }
+
+
+metrics = Metrics()
@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+
+from app.controllers.model_catalog_controller import ModelCatalogController
+from app.db import Base, engine
+from app.models.model_catalog_orm import ModelCatalogORM
+from app.utils.model_catalog_store import prewarm_pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-warm the model catalog for popular appliance/brand pairs"
+    )
+    parser.add_argument(
+        "pairs",
+        nargs="*",
+        help="Type:Brand pairs (defaults to MODEL_CATALOG_PREWARM or the "
+             "built-in popular list)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Refresh entries that are still fresh"
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    pairs = []
+    for item in args.pairs:
+        appliance_type, _, brand = item.partition(":")
+        if not appliance_type.strip() or not brand.strip():
+            parser.error(f"Expected Type:Brand, got {item!r}")
+        pairs.append((appliance_type.strip(), brand.strip()))
+
+    pairs = pairs or prewarm_pairs()
+    warmed = asyncio.run(ModelCatalogController.prewarm(pairs, args.force))
+    print(f"[model-catalog] Refreshed {warmed} of {len(pairs)} pairs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.db import SessionLocal
+from app.models.model_catalog_orm import ModelCatalogORM
+
+MODEL_CATALOG_FRESH_S = float(
+    os.getenv("MODEL_CATALOG_FRESH_S", str(30 * 86400))
+)
+MODEL_CATALOG_PREWARM_ON_STARTUP = os.getenv(
+    "MODEL_CATALOG_PREWARM_ON_STARTUP", "0"
+) == "1"
+MODEL_CATALOG_PREWARM_CONCURRENCY = int(
+    os.getenv("MODEL_CATALOG_PREWARM_CONCURRENCY", "2")
+)
+MODEL_CATALOG_MEMORY_ENTRIES = int(
+    os.getenv("MODEL_CATALOG_MEMORY_ENTRIES", "1024")
+)
+
+# Pairs pre-warmed at startup and by the prewarm command; override with
+# MODEL_CATALOG_PREWARM="Type:Brand,Type:Brand".
+POPULAR_CATALOG_PAIRS = [
+    ("Washing Machine", "LG"),
+    ("Washing Machine", "Samsung"),
+    ("Washing Machine", "Whirlpool"),
+    ("Washing Machine", "IFB"),
+    ("Refrigerator", "LG"),
+    ("Refrigerator", "Samsung"),
+    ("Refrigerator", "Whirlpool"),
+    ("Refrigerator", "Godrej"),
+    ("Air Conditioner", "Voltas"),
+    ("Air Conditioner", "Daikin"),
+    ("Air Conditioner", "LG"),
+    ("Air Conditioner", "Blue Star"),
+    ("Television", "Sony"),
+    ("Television", "Samsung"),
+    ("Television", "LG"),
+    ("Microwave", "LG"),
+    ("Microwave", "Samsung"),
+    ("Water Purifier", "Kent"),
+    ("Water Purifier", "Aquaguard"),
+]
+
+CatalogKey = tuple[str, str]
+
+
+def catalog_key(appliance_type: str, brand: str) -> CatalogKey:
+    return (
+        " ".join(appliance_type.lower().split()),
+        " ".join(brand.lower().split())
+    )
+
+
+def prewarm_pairs() -> list[CatalogKey]:
+    configured = os.getenv("MODEL_CATALOG_PREWARM")
+    if not configured:
+        return list(POPULAR_CATALOG_PAIRS)
+    pairs = []
+    for item in configured.split(","):
+        appliance_type, _, brand = item.partition(":")
+        if appliance_type.strip() and brand.strip():
+            pairs.append((appliance_type.strip(), brand.strip()))
+    return pairs
+
+
+class ModelCatalogStore:
+
+    def __init__(
+        self,
+        fresh_s: float = MODEL_CATALOG_FRESH_S,
+        memory_entries: int = MODEL_CATALOG_MEMORY_ENTRIES
+    ):
+        self.fresh_s = fresh_s
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[CatalogKey, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def _remember(self, key: CatalogKey, entry: tuple[float, dict[str, Any]]):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.fresh_s
+
+    def get(self, key: CatalogKey) -> tuple[float, dict[str, Any]] | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                self._memory.move_to_end(key)
+        if entry:
+            return entry
+
+        db = SessionLocal()
+        try:
+            record = (
+                db.query(ModelCatalogORM)
+                .filter_by(appliance_type=key[0], brand=key[1])
+                .first()
+            )
+            if not record:
+                return None
+            entry = (record.fetched_at, json.loads(record.models_json))
+        finally:
+            db.close()
+
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: CatalogKey, catalog: dict[str, Any]):
+        now = time.time()
+        db = SessionLocal()
+        try:
+            record = (
+                db.query(ModelCatalogORM)
+                .filter_by(appliance_type=key[0], brand=key[1])
+                .first()
+            )
+            if not record:
+                record = ModelCatalogORM(appliance_type=key[0], brand=key[1])
+                db.add(record)
+            record.models_json = json.dumps(catalog, separators=(",", ":"))
+            record.fetched_at = now
+            db.commit()
+        finally:
+            db.close()
+
+        self._remember(key, (now, catalog))
+
+
+model_catalog_store = ModelCatalogStore()
@@ -0,0 +1,92 @@
+import argparse
+import csv
+import json
+from collections import defaultdict
+from typing import Any, Iterator
+
+from app.db import Base, engine
+from app.models.catalog_item_orm import CatalogItemORM
+from app.utils.model_index import model_index
+
+# Accepted spellings of each column in CSV headers and JSON keys.
+FIELD_ALIASES = {
+    "applianceType": ("applianceType", "appliance_type", "appliance"),
+    "brand": ("brand",),
+    "modelName": ("modelName", "model_name", "model", "name"),
+    "capacity": ("capacity",),
+    "type": ("type",),
+}
+
+
+def _normalize_row(row: dict[str, Any]) -> dict[str, Any]:
+    normalized = {}
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            if row.get(alias):
+                normalized[field] = str(row[alias]).strip()
+                break
+    return normalized
+
+
+def iter_csv(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            yield _normalize_row(row)
+
+
+def iter_json(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+
+    # Either a flat list of models, or catalog entries shaped like the
+    # /get-models response with applianceType and brand alongside.
+    entries = data if isinstance(data, list) else [data]
+    for entry in entries:
+        if "models" in entry:
+            for model in entry["models"]:
+                yield _normalize_row({
+                    "applianceType": entry.get("applianceType"),
+                    "brand": entry.get("brand"),
+                    **model
+                })
+        else:
+            yield _normalize_row(entry)
+
+
+def import_models(rows: Iterator[dict[str, Any]], source: str) -> int:
+    grouped = defaultdict(list)
+    for row in rows:
+        if row.get("applianceType") and row.get("brand") and row.get("modelName"):
+            grouped[(row["applianceType"], row["brand"])].append(row)
+
+    return sum(
+        model_index.add(appliance_type, brand, models, source)
+        for (appliance_type, brand), models in grouped.items()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import appliance models into the local search index"
+    )
+    parser.add_argument("path", help="CSV or JSON file of models")
+    parser.add_argument(
+        "--source",
+        default="import",
+        help="Source label stored with the imported rows"
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    if args.path.endswith(".csv"):
+        rows = iter_csv(args.path)
+    else:
+        rows = iter_json(args.path)
+
+    count = import_models(rows, args.source)
+    print(f"[model-import] Imported {count} models")
+
+
+if __name__ == "__main__":
+    main()
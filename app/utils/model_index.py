@@ -0,0 +1,249 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Iterable
+
+from app.db import SessionLocal
+from app.models.catalog_item_orm import CatalogItemORM
+from app.utils.model_catalog_store import catalog_key
+
+MODEL_INDEX_MIN_SIMILARITY = 0.4
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Per query token: an exact token beats a prefix, which beats a fuzzy match
+# (scaled by trigram similarity).
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.5
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ModelSearchIndex:
+
+    def __init__(self, min_similarity: float = MODEL_INDEX_MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self._items: dict[tuple[str, str, str], dict[str, Any]] = {}
+        self._postings: dict[str, set[tuple[str, str, str]]] = defaultdict(set)
+        self._vocabulary: list[str] = []
+        self._trigram_postings: dict[str, set[str]] = defaultdict(set)
+        self._trigram_counts: dict[str, int] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _index_item(self, key: tuple[str, str, str], item: dict[str, Any]):
+        self._items[key] = item
+        text = " ".join(
+            item.get(field) or "" for field in ("modelName", "capacity", "type")
+        )
+        tokens = set(_tokens(text))
+        # "WM-1234AB" is also indexed as "wm1234ab" so it prefix-matches
+        # however the user types it.
+        tokens.add("".join(_tokens(item["modelName"])))
+        for token in tokens:
+            if token not in self._postings:
+                bisect.insort(self._vocabulary, token)
+                grams = _trigrams(token)
+                self._trigram_counts[token] = len(grams)
+                for gram in grams:
+                    self._trigram_postings[gram].add(token)
+            self._postings[token].add(key)
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._loaded:
+                return
+            db = SessionLocal()
+            try:
+                for record in db.query(CatalogItemORM).all():
+                    self._index_item(
+                        (record.appliance_type, record.brand,
+                         record.model_name.lower()),
+                        {
+                            "modelName": record.model_name,
+                            "capacity": record.capacity or "",
+                            "type": record.type or "",
+                            "applianceType": record.appliance_type,
+                            "brand": record.brand
+                        }
+                    )
+            finally:
+                db.close()
+            self._loaded = True
+
+    def add(
+        self,
+        appliance_type: str,
+        brand: str,
+        models: Iterable[dict[str, Any]],
+        source: str
+    ) -> int:
+        appliance_type, brand = catalog_key(appliance_type, brand)
+        items = {}
+        for model in models:
+            if not isinstance(model, dict):
+                continue
+            name = str(model.get("modelName") or "").strip()
+            if not name:
+                continue
+            items[(appliance_type, brand, name.lower())] = {
+                "modelName": name,
+                "capacity": str(model.get("capacity") or "").strip(),
+                "type": str(model.get("type") or "").strip(),
+                "applianceType": appliance_type,
+                "brand": brand
+            }
+        if not items:
+            return 0
+
+        now = time.time()
+        db = SessionLocal()
+        try:
+            existing = {
+                (record.appliance_type, record.brand,
+                 record.model_name.lower()): record
+                for record in db.query(CatalogItemORM).filter_by(
+                    appliance_type=appliance_type, brand=brand
+                )
+            }
+            for key, item in items.items():
+                record = existing.get(key)
+                if not record:
+                    record = CatalogItemORM(
+                        appliance_type=appliance_type,
+                        brand=brand,
+                        model_name=item["modelName"]
+                    )
+                    db.add(record)
+                record.capacity = item["capacity"]
+                record.type = item["type"]
+                record.source = source
+                record.updated_at = now
+            db.commit()
+        finally:
+            db.close()
+
+        self._ensure_loaded()
+        with self._lock:
+            for key, item in items.items():
+                self._index_item(key, item)
+        return len(items)
+
+    def _expand(
+        self,
+        token: str,
+        prefix: bool,
+        fuzzy: bool = True
+    ) -> dict[str, float]:
+        matches = {}
+        if token in self._postings:
+            matches[token] = EXACT_SCORE
+
+        if prefix:
+            position = bisect.bisect_left(self._vocabulary, token)
+            while position < len(self._vocabulary):
+                candidate = self._vocabulary[position]
+                if not candidate.startswith(token):
+                    break
+                matches.setdefault(candidate, PREFIX_SCORE)
+                position += 1
+
+        if fuzzy and not matches and len(token) >= 3:
+            grams = _trigrams(token)
+            counts = Counter()
+            for gram in grams:
+                counts.update(self._trigram_postings.get(gram, ()))
+            for candidate, shared in counts.items():
+                similarity = 2 * shared / (
+                    len(grams) + self._trigram_counts[candidate]
+                )
+                if similarity >= self.min_similarity:
+                    matches[candidate] = FUZZY_SCORE * similarity
+        return matches
+
+    def _score(
+        self,
+        tokens: list[str],
+        type_filter: tuple[str, str],
+        fuzzy: bool = True
+    ) -> dict[tuple[str, str, str], float]:
+        # The last token is still being typed, so it also matches prefixes.
+        expansions = [
+            self._expand(token, position == len(tokens) - 1, fuzzy)
+            for position, token in enumerate(tokens)
+        ]
+        if not all(expansions):
+            return {}
+
+        # Every token must match. Start from the most selective one and only
+        # check the surviving items against the rest.
+        expansions.sort(
+            key=lambda matches: sum(
+                len(self._postings[candidate]) for candidate in matches
+            )
+        )
+        scores: dict[tuple[str, str, str], float] = {}
+        for candidate, score in expansions[0].items():
+            for key in self._postings[candidate]:
+                if (type_filter[0] and key[0] != type_filter[0]) or (
+                    type_filter[1] and key[1] != type_filter[1]
+                ):
+                    continue
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+
+        for matches in expansions[1:]:
+            best: dict[tuple[str, str, str], float] = {}
+            for candidate, score in matches.items():
+                for key in scores.keys() & self._postings[candidate]:
+                    if score > best.get(key, 0.0):
+                        best[key] = score
+            scores = {key: scores[key] + score for key, score in best.items()}
+            if not scores:
+                break
+        return scores
+
+    def search(
+        self,
+        query: str,
+        appliance_type: str | None = None,
+        brand: str | None = None,
+        limit: int = 10
+    ) -> list[dict[str, Any]]:
+        self._ensure_loaded()
+        tokens = _tokens(query)
+        if not tokens:
+            return []
+
+        type_filter = catalog_key(appliance_type or "", brand or "")
+        with self._lock:
+            scores = self._score(tokens, type_filter)
+            if len(tokens) > 1 and len(scores) < limit:
+                # "FHM-12" should still find "FHM1207SDW".
+                compact = self._score(
+                    ["".join(tokens)], type_filter, fuzzy=False
+                )
+                for key, score in compact.items():
+                    scores[key] = max(scores.get(key, 0.0), score * len(tokens))
+
+            top = heapq.nlargest(
+                limit, scores.items(), key=lambda entry: entry[1]
+            )
+            return [
+                {**self._items[key], "score": round(score, 3)}
+                for key, score in top
+            ]
+
+
+model_index = ModelSearchIndex()
@@ -0,0 +1,164 @@
+import argparse
+from typing import Any, Iterator
+
+import ijson
+
+from app.db import Base, engine
+from app.utils.geo import BBox
+from app.utils.osm_index import INDEXED_TAG_KEYS, import_pois
+
+_COORD_KEYS = ("lat", "center", "geometry", "bounds")
+
+
+def _centroid(points: list[tuple[float, float]]) -> tuple[float, float] | None:
+    if not points:
+        return None
+    lat = sum(point[0] for point in points) / len(points)
+    lon = sum(point[1] for point in points) / len(points)
+    return lat, lon
+
+
+def _iter_elements(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, "rb") as handle:
+        yield from ijson.items(handle, "elements.item", use_float=True)
+
+
+def _with_coords(
+    el: dict[str, Any],
+    node_coords: dict[int, tuple[float, float]]
+) -> dict[str, Any] | None:
+    tags = el["tags"]
+
+    if "lat" in el:
+        coords = (el["lat"], el["lon"])
+    elif "center" in el:
+        coords = (el["center"]["lat"], el["center"]["lon"])
+    elif "geometry" in el:
+        coords = _centroid([
+            (point["lat"], point["lon"]) for point in el["geometry"]
+        ])
+    elif "bounds" in el:
+        bounds = el["bounds"]
+        coords = (
+            (bounds["minlat"] + bounds["maxlat"]) / 2,
+            (bounds["minlon"] + bounds["maxlon"]) / 2
+        )
+    else:
+        coords = _centroid([
+            node_coords[node_id]
+            for node_id in el.get("nodes", [])
+            if node_id in node_coords
+        ])
+
+    if not coords:
+        return None
+    return {
+        "type": el["type"],
+        "id": el["id"],
+        "lat": coords[0],
+        "lon": coords[1],
+        "tags": tags
+    }
+
+
+def iter_overpass_dump(path: str) -> Iterator[dict[str, Any]]:
+    # Streamed in two passes so a regional dump never has to fit in memory:
+    # the first yields everything with its own coordinates and remembers
+    # ways that only list node ids, the second resolves just those nodes.
+    pending = []
+    for el in _iter_elements(path):
+        tags = el.get("tags")
+        if not tags or not any(key in tags for key in INDEXED_TAG_KEYS):
+            continue
+        if not any(key in el for key in _COORD_KEYS):
+            if el.get("nodes"):
+                pending.append(el)
+            continue
+        place = _with_coords(el, {})
+        if place:
+            yield place
+
+    if not pending:
+        return
+
+    wanted = {node_id for el in pending for node_id in el["nodes"]}
+    node_coords = {
+        el["id"]: (el["lat"], el["lon"])
+        for el in _iter_elements(path)
+        if el.get("type") == "node" and el.get("id") in wanted and "lat" in el
+    }
+    for el in pending:
+        place = _with_coords(el, node_coords)
+        if place:
+            yield place
+
+
+def iter_pbf(path: str) -> Iterator[dict[str, Any]]:
+    try:
+        import osmium
+    except ImportError as exc:
+        raise RuntimeError("osmium (pyosmium) is not installed") from exc
+
+    for obj in osmium.FileProcessor(path).with_locations():
+        tags = dict(obj.tags)
+        if not any(key in tags for key in INDEXED_TAG_KEYS):
+            continue
+
+        if obj.is_node():
+            if not obj.location.valid():
+                continue
+            coords = (obj.location.lat, obj.location.lon)
+            el_type = "node"
+        elif obj.is_way():
+            coords = _centroid([
+                (node.location.lat, node.location.lon)
+                for node in obj.nodes
+                if node.location.valid()
+            ])
+            el_type = "way"
+        else:
+            continue
+
+        if not coords:
+            continue
+        yield {
+            "type": el_type,
+            "id": obj.id,
+            "lat": coords[0],
+            "lon": coords[1],
+            "tags": tags
+        }
+
+
+def _parse_bbox(raw: str) -> BBox:
+    south, west, north, east = (float(part) for part in raw.split(","))
+    return south, west, north, east
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import an OSM extract into the local POI index"
+    )
+    parser.add_argument("path", help="Regional .osm.pbf or Overpass JSON dump")
+    parser.add_argument("--name", required=True, help="Region name")
+    parser.add_argument(
+        "--bbox",
+        help="south,west,north,east covered by the extract "
+             "(defaults to the extent of imported POIs)"
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+
+    if args.path.endswith(".pbf"):
+        elements = iter_pbf(args.path)
+    else:
+        elements = iter_overpass_dump(args.path)
+
+    bbox = _parse_bbox(args.bbox) if args.bbox else None
+    count = import_pois(elements, args.name, bbox)
+    print(f"[osm-import] Imported {count} POIs into region {args.name}")
+
+
+if __name__ == "__main__":
+    main()
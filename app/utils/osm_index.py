@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import delete, insert, or_
+
+from app.db import SessionLocal
+from app.models.osm_poi_orm import OsmPoiORM
+from app.models.osm_region_orm import OsmRegionORM
+from app.utils.geo import (
+    BBox,
+    covering_geohashes,
+    geohash_encode,
+    haversine_m,
+    radius_bbox,
+)
+from app.utils.overpass import OsmTag
+
+OSM_LOCAL_INDEX = os.getenv("OSM_LOCAL_INDEX", "true").lower() in (
+    "1", "true", "yes"
+)
+OSM_INDEX_PRECISION = 5
+OSM_REGION_REFRESH_S = 60
+OSM_IMPORT_BATCH = 5000
+
+INDEXED_TAG_KEYS = (
+    "shop",
+    "amenity",
+    "office",
+    "craft",
+    "tourism",
+    "leisure",
+    "healthcare",
+)
+
+
+class OsmPoiIndex:
+
+    def __init__(self, enabled: bool = OSM_LOCAL_INDEX):
+        self.enabled = enabled
+        self._regions: list[BBox] = []
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _region_boxes(self) -> list[BBox]:
+        with self._lock:
+            if time.time() - self._loaded_at < OSM_REGION_REFRESH_S:
+                return self._regions
+
+        db = SessionLocal()
+        try:
+            regions = [
+                (r.south, r.west, r.north, r.east)
+                for r in db.query(OsmRegionORM).all()
+            ]
+        finally:
+            db.close()
+
+        with self._lock:
+            self._regions = regions
+            self._loaded_at = time.time()
+        return regions
+
+    def refresh(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def covers(self, lat: float, lon: float, radius_m: int) -> bool:
+        if not self.enabled:
+            return False
+        south, west, north, east = radius_bbox(lat, lon, radius_m)
+        return any(
+            r_south <= south and r_west <= west
+            and north <= r_north and east <= r_east
+            for r_south, r_west, r_north, r_east in self._region_boxes()
+        )
+
+    @staticmethod
+    def supports(tag: OsmTag) -> bool:
+        return tag[0] in INDEXED_TAG_KEYS
+
+    def query(
+        self,
+        tags: list[OsmTag],
+        lat: float,
+        lon: float,
+        radius_m: int
+    ) -> list[dict[str, Any]]:
+        conditions = [
+            getattr(OsmPoiORM, key) == value
+            for key, value in tags
+            if key in INDEXED_TAG_KEYS
+        ]
+        if not conditions:
+            return []
+
+        tiles = covering_geohashes(lat, lon, radius_m, OSM_INDEX_PRECISION)
+        db = SessionLocal()
+        try:
+            records = (
+                db.query(OsmPoiORM)
+                .filter(OsmPoiORM.tile.in_(tiles))
+                .filter(or_(*conditions))
+                .all()
+            )
+        finally:
+            db.close()
+
+        elements = []
+        for record in records:
+            if haversine_m(lat, lon, record.lat, record.lon) > radius_m:
+                continue
+            el_type, _, el_id = record.id.partition("_")
+            elements.append({
+                "type": el_type,
+                "id": int(el_id) if el_id.isdigit() else el_id,
+                "lat": record.lat,
+                "lon": record.lon,
+                "tags": json.loads(record.tags_json)
+            })
+        return elements
+
+
+def _poi_row(el: dict[str, Any]) -> dict[str, Any] | None:
+    tags = el.get("tags") or {}
+    if not any(key in tags for key in INDEXED_TAG_KEYS):
+        return None
+    lat = el["lat"]
+    lon = el["lon"]
+    row = {
+        "id": f"{el['type']}_{el['id']}",
+        "tile": geohash_encode(lat, lon, OSM_INDEX_PRECISION),
+        "lat": lat,
+        "lon": lon,
+        "name": tags.get("name"),
+        "tags_json": json.dumps(tags, separators=(",", ":"))
+    }
+    for key in INDEXED_TAG_KEYS:
+        row[key] = tags.get(key)
+    return row
+
+
+def _batched(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_pois(
+    elements: Iterable[dict[str, Any]],
+    region_name: str,
+    bbox: BBox | None = None
+) -> int:
+    count = 0
+    south, west, north, east = 90.0, 180.0, -90.0, -180.0
+    rows = (row for row in map(_poi_row, elements) if row)
+
+    db = SessionLocal()
+    try:
+        region = (
+            db.query(OsmRegionORM)
+            .filter(OsmRegionORM.name == region_name)
+            .first()
+        )
+        # A re-import replaces the region: POIs removed upstream go with the
+        # old rows. Everything below commits once, so a failed import leaves
+        # the previous data intact.
+        stale_boxes = [bbox] if bbox else []
+        if region:
+            stale_boxes.append(
+                (region.south, region.west, region.north, region.east)
+            )
+        for box_south, box_west, box_north, box_east in stale_boxes:
+            db.execute(
+                delete(OsmPoiORM).where(
+                    OsmPoiORM.lat.between(box_south, box_north),
+                    OsmPoiORM.lon.between(box_west, box_east)
+                )
+            )
+
+        for batch in _batched(rows, OSM_IMPORT_BATCH):
+            # Delete-then-insert in one transaction is a replace on every
+            # dialect DATABASE_URL may point at.
+            batch = list({row["id"]: row for row in batch}.values())
+            db.execute(
+                delete(OsmPoiORM).where(
+                    OsmPoiORM.id.in_([row["id"] for row in batch])
+                )
+            )
+            db.execute(insert(OsmPoiORM), batch)
+            count += len(batch)
+            for row in batch:
+                south = min(south, row["lat"])
+                north = max(north, row["lat"])
+                west = min(west, row["lon"])
+                east = max(east, row["lon"])
+
+        if bbox is None:
+            if not count:
+                db.rollback()
+                return 0
+            bbox = (south, west, north, east)
+
+        if not region:
+            region = OsmRegionORM(name=region_name)
+            db.add(region)
+        region.south, region.west, region.north, region.east = bbox
+        region.poi_count = count
+        region.imported_at = time.time()
+        db.commit()
+    finally:
+        db.close()
+
+    osm_poi_index.refresh()
+    return count
+
+
+osm_poi_index = OsmPoiIndex()
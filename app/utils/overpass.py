@@ -0,0 +1,135 @@
+import os
+from typing import Any, Iterable
+
+import httpx
+import ijson
+
+from app.utils.geo import BBox
+from app.utils.http_client import get_http_client
+from app.utils.overpass_pool import EndpointUnavailableError, overpass_pool
+
+OVERPASS_TIMEOUT_S = float(os.getenv("OVERPASS_TIMEOUT_S", "15"))
+
+OsmTag = tuple[str, str]
+
+
+class OverpassError(RuntimeError):
+    pass
+
+
+def _quote(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _union_query(tags: Iterable[OsmTag], area: str) -> str:
+    statements = []
+    for key, value in tags:
+        selector = f"[{_quote(key)}={_quote(value)}]"
+        statements.append(f"  node{selector}{area};")
+        statements.append(f"  way{selector}{area};")
+    body = "\n".join(statements)
+    return f"[out:json];\n(\n{body}\n);\nout center;"
+
+
+def build_union_query(
+    tags: Iterable[OsmTag],
+    lat: float,
+    lon: float,
+    radius_m: int
+) -> str:
+    return _union_query(tags, f"(around:{radius_m},{lat},{lon})")
+
+
+def build_bbox_query(tags: Iterable[OsmTag], bbox: BBox) -> str:
+    south, west, north, east = bbox
+    return _union_query(tags, f"({south},{west},{north},{east})")
+
+
+def _compact(el: dict[str, Any]) -> dict[str, Any] | None:
+    if not el.get("tags"):
+        return None
+    lat, lon = element_coords(el)
+    if lat is None or lon is None:
+        return None
+    return {
+        "type": el.get("type"),
+        "id": el.get("id"),
+        "lat": lat,
+        "lon": lon,
+        "tags": el["tags"]
+    }
+
+
+async def _send(url: str, query: str) -> list[dict[str, Any]]:
+    elements = []
+    sink = ijson.sendable_list()
+    # Elements are decoded one at a time from the response stream, so only
+    # the compacted elements we keep are ever held in memory.
+    parser = ijson.items_coro(sink, "elements.item", use_float=True)
+    # Timeouts and out-of-memory aborts still answer HTTP 200, with partial
+    # elements and a top-level remark; those must never reach the cache.
+    remarks = ijson.sendable_list()
+    remark_parser = ijson.items_coro(remarks, "remark")
+
+    try:
+        async with get_http_client().stream(
+            "POST",
+            url,
+            data={"data": query},
+            timeout=OVERPASS_TIMEOUT_S
+        ) as res:
+            if res.status_code != 200:
+                raise OverpassError(
+                    f"Overpass returned HTTP {res.status_code}"
+                )
+            async for chunk in res.aiter_bytes():
+                parser.send(chunk)
+                remark_parser.send(chunk)
+                for el in sink:
+                    compact = _compact(el)
+                    if compact:
+                        elements.append(compact)
+                del sink[:]
+    except httpx.HTTPError as exc:
+        raise OverpassError(f"Overpass request failed: {exc}") from exc
+    except ijson.JSONError as exc:
+        raise OverpassError(f"Malformed Overpass response: {exc}") from exc
+
+    parser.close()
+    remark_parser.close()
+    for remark in remarks:
+        if isinstance(remark, str) and remark.startswith("runtime error"):
+            raise OverpassError(f"Overpass aborted the query: {remark}")
+    return elements
+
+
+async def fetch_elements(query: str) -> list[dict[str, Any]]:
+    try:
+        return await overpass_pool.fetch(query, _send)
+    except EndpointUnavailableError as exc:
+        raise OverpassError(str(exc)) from exc
+
+
+def element_coords(el: dict[str, Any]) -> tuple[float | None, float | None]:
+    lat = el.get("lat") or el.get("center", {}).get("lat")
+    lon = el.get("lon") or el.get("center", {}).get("lon")
+    return lat, lon
+
+
+def element_id(el: dict[str, Any]) -> str:
+    return f"{el.get('type', '')}_{el.get('id', '')}"
+
+
+def route_by_tag(
+    elements: Iterable[dict[str, Any]],
+    tags: Iterable[OsmTag]
+) -> dict[OsmTag, list[dict[str, Any]]]:
+    routed: dict[OsmTag, list[dict[str, Any]]] = {tag: [] for tag in tags}
+    for el in elements:
+        el_tags = el.get("tags", {})
+        for tag in routed:
+            key, value = tag
+            if el_tags.get(key) == value:
+                routed[tag].append(el)
+    return routed
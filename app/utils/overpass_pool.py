@@ -0,0 +1,89 @@
+import logging
+import os
+from typing import Any, Awaitable, Callable
+
+from app.utils.hedging import HealthStats, HedgedRace
+from app.utils.metrics import metrics
+
+OVERPASS_ENDPOINTS = [
+    url.strip()
+    for url in os.getenv(
+        "OVERPASS_ENDPOINTS",
+        "https://overpass-api.de/api/interpreter,"
+        "https://overpass.kumi.systems/api/interpreter"
+    ).split(",")
+    if url.strip()
+]
+OVERPASS_HEDGE_DELAY_S = float(os.getenv("OVERPASS_HEDGE_DELAY_S", "2.0"))
+OVERPASS_BREAKER_FAILURES = int(os.getenv("OVERPASS_BREAKER_FAILURES", "3"))
+OVERPASS_BREAKER_COOLDOWN_S = float(
+    os.getenv("OVERPASS_BREAKER_COOLDOWN_S", "30")
+)
+OVERPASS_EWMA_ALPHA = 0.3
+
+logger = logging.getLogger(__name__)
+
+Sender = Callable[[str, str], Awaitable[list[dict[str, Any]]]]
+
+
+class EndpointUnavailableError(RuntimeError):
+    pass
+
+
+class OverpassEndpointPool:
+
+    def __init__(
+        self,
+        urls: list[str] = OVERPASS_ENDPOINTS,
+        hedge_delay_s: float = OVERPASS_HEDGE_DELAY_S
+    ):
+        self.endpoints = [
+            HealthStats(
+                url,
+                OVERPASS_BREAKER_FAILURES,
+                OVERPASS_BREAKER_COOLDOWN_S,
+                OVERPASS_EWMA_ALPHA
+            )
+            for url in urls
+        ]
+        self._race = HedgedRace("overpass", hedge_delay_s, "retried")
+
+    async def _send(
+        self,
+        stats: HealthStats,
+        query: str,
+        send: Sender
+    ) -> list[dict[str, Any]]:
+        try:
+            result = await send(stats.key, query)
+        except Exception as exc:
+            logger.warning("Overpass endpoint %s failed: %s", stats.key, exc)
+            metrics.increment("overpass_endpoint_error", stats.key)
+            raise
+        metrics.increment("overpass_endpoint", stats.key)
+        return result
+
+    async def fetch(self, query: str, send: Sender) -> list[dict[str, Any]]:
+        candidates = self._race.ranked(self.endpoints)
+        if not candidates:
+            raise EndpointUnavailableError("All Overpass endpoints are open")
+
+        try:
+            return await self._race.run(
+                candidates,
+                lambda stats: self._send(stats, query, send)
+            )
+        except Exception as exc:
+            raise EndpointUnavailableError(
+                f"All Overpass endpoints failed: {exc}"
+            ) from exc
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._race.lock:
+            return [
+                {"url": stats.key, **stats.snapshot()}
+                for stats in self.endpoints
+            ]
+
+
+overpass_pool = OverpassEndpointPool()
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import tuple_
+
+from app.db import SessionLocal
+from app.models.overpass_tile_orm import OverpassTileORM
+from app.utils.geo import (
+    covering_geohashes,
+    geohash_bbox,
+    geohash_encode,
+    haversine_m,
+    merge_bboxes,
+)
+from app.utils.overpass import (
+    OsmTag,
+    build_bbox_query,
+    build_union_query,
+    element_coords,
+    element_id,
+    route_by_tag,
+)
+
+OVERPASS_TILE_PRECISION = int(os.getenv("OVERPASS_TILE_PRECISION", "5"))
+OVERPASS_TILE_TTL_S = float(os.getenv("OVERPASS_TILE_TTL_S", str(3 * 86400)))
+OVERPASS_TILE_MEMORY_ENTRIES = int(
+    os.getenv("OVERPASS_TILE_MEMORY_ENTRIES", "4096")
+)
+
+TileKey = tuple[str, str, str]
+
+
+class OverpassTileCache:
+
+    def __init__(
+        self,
+        precision: int = OVERPASS_TILE_PRECISION,
+        ttl_s: float = OVERPASS_TILE_TTL_S,
+        memory_entries: int = OVERPASS_TILE_MEMORY_ENTRIES
+    ):
+        self.precision = precision
+        self.ttl_s = ttl_s
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[TileKey, tuple[float, list]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key: TileKey, fetched_at: float, elements: list):
+        with self._lock:
+            self._memory[key] = (fetched_at, elements)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _load(self, keys: list[TileKey]) -> dict[TileKey, list]:
+        fresh_after = time.time() - self.ttl_s
+        found: dict[TileKey, list] = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry and entry[0] > fresh_after:
+                    self._memory.move_to_end(key)
+                    found[key] = entry[1]
+                else:
+                    missing.append(key)
+
+        if not missing:
+            return found
+
+        db = SessionLocal()
+        try:
+            records = (
+                db.query(OverpassTileORM)
+                .filter(
+                    tuple_(
+                        OverpassTileORM.tile,
+                        OverpassTileORM.tag_key,
+                        OverpassTileORM.tag_value
+                    ).in_(missing)
+                )
+                .filter(OverpassTileORM.fetched_at > fresh_after)
+                .all()
+            )
+            for record in records:
+                key = (record.tile, record.tag_key, record.tag_value)
+                elements = json.loads(record.elements_json)
+                self._remember(key, record.fetched_at, elements)
+                found[key] = elements
+        finally:
+            db.close()
+        return found
+
+    def _assign(
+        self,
+        tiles: list[str],
+        tags: list[OsmTag],
+        elements: list
+    ) -> dict[TileKey, list]:
+        per_tile: dict[str, list] = {tile: [] for tile in tiles}
+        for el in elements:
+            lat, lon = element_coords(el)
+            if lat is None or lon is None:
+                continue
+            tile = geohash_encode(lat, lon, self.precision)
+            if tile in per_tile:
+                per_tile[tile].append(el)
+
+        assigned = {}
+        for tile, tile_elements in per_tile.items():
+            routed = route_by_tag(tile_elements, tags)
+            for (tag_key, tag_value), tagged in routed.items():
+                assigned[(tile, tag_key, tag_value)] = tagged
+        return assigned
+
+    def _store(self, tiles: list[str], tags: list[OsmTag], elements: list):
+        now = time.time()
+        assigned = self._assign(tiles, tags, elements)
+
+        keys = [(tile, key, value) for tile in tiles for key, value in tags]
+        db = SessionLocal()
+        try:
+            existing = {
+                (record.tile, record.tag_key, record.tag_value): record
+                for record in db.query(OverpassTileORM).filter(
+                    tuple_(
+                        OverpassTileORM.tile,
+                        OverpassTileORM.tag_key,
+                        OverpassTileORM.tag_value
+                    ).in_(keys)
+                )
+            }
+            for key, tagged in assigned.items():
+                record = existing.get(key)
+                if not record:
+                    tile, tag_key, tag_value = key
+                    record = OverpassTileORM(
+                        tile=tile,
+                        tag_key=tag_key,
+                        tag_value=tag_value
+                    )
+                    db.add(record)
+                record.elements_json = json.dumps(
+                    tagged, separators=(",", ":")
+                )
+                record.fetched_at = now
+                self._remember(key, now, tagged)
+            db.commit()
+        finally:
+            db.close()
+
+    async def query(
+        self,
+        tags: list[OsmTag],
+        lat: float,
+        lon: float,
+        radius_m: int,
+        fetch: Callable[[str], Awaitable[list[dict[str, Any]]]],
+        fill_cache: bool = True
+    ) -> list[dict[str, Any]]:
+        tiles = covering_geohashes(lat, lon, radius_m, self.precision)
+        keys = [(tile, key, value) for tile in tiles for key, value in tags]
+        cached = await asyncio.to_thread(self._load, keys)
+
+        missing = [key for key in keys if key not in cached]
+        extra = []
+        if missing and not fill_cache:
+            # Sized to the radius itself instead of whole tiles; the answer
+            # covers no tile completely, so it is served but not stored.
+            missing_tags = list(dict.fromkeys(key[1:] for key in missing))
+            extra = await fetch(
+                build_union_query(missing_tags, lat, lon, radius_m)
+            )
+            missing_keys = set(missing)
+            cached = {
+                key: value for key, value in cached.items()
+                if key not in missing_keys
+            }
+        elif missing:
+            missing_tiles = list(dict.fromkeys(key[0] for key in missing))
+            missing_tags = list(dict.fromkeys(key[1:] for key in missing))
+            bbox = merge_bboxes([geohash_bbox(tile) for tile in missing_tiles])
+            elements = await fetch(build_bbox_query(missing_tags, bbox))
+            await asyncio.to_thread(
+                self._store, missing_tiles, missing_tags, elements
+            )
+            cached = await asyncio.to_thread(self._load, keys)
+
+        results = []
+        seen = set()
+        for batch in [cached.get(key, []) for key in keys] + [extra]:
+            for el in batch:
+                osm_id = element_id(el)
+                if osm_id in seen:
+                    continue
+                el_lat, el_lon = element_coords(el)
+                if haversine_m(lat, lon, el_lat, el_lon) > radius_m:
+                    continue
+                seen.add(osm_id)
+                results.append(el)
+        return results
+
+
+overpass_tile_cache = OverpassTileCache()
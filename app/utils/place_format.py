@@ -0,0 +1,70 @@
+from typing import Any, Iterable
+
+PLACE_FIELDS = (
+    "name",
+    "lat",
+    "lon",
+    "distance",
+    "address",
+    "tags",
+    "mapUrl",
+    "matchScore",
+)
+DEFAULT_PLACE_FIELDS = ("name", "lat", "lon", "distance", "address")
+
+_ADDRESS_PARTS = (
+    ("addr:housenumber", "addr:street"),
+    ("addr:suburb",),
+    ("addr:city",),
+    ("addr:postcode",),
+)
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...]:
+    if not fields:
+        return DEFAULT_PLACE_FIELDS
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    if "all" in requested:
+        return PLACE_FIELDS
+    unknown = [field for field in requested if field not in PLACE_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. "
+            f"Available: {', '.join(PLACE_FIELDS)}"
+        )
+    return tuple(dict.fromkeys(requested))
+
+
+def format_address(tags: dict[str, Any]) -> str:
+    if tags.get("addr:full"):
+        return tags["addr:full"]
+    parts = []
+    for keys in _ADDRESS_PARTS:
+        part = " ".join(tags[key] for key in keys if tags.get(key))
+        if part:
+            parts.append(part)
+    return ", ".join(parts)
+
+
+def map_url(lat: float, lon: float) -> str:
+    return (
+        f"https://www.openstreetmap.org/"
+        f"?mlat={lat}&mlon={lon}#map=17/{lat}/{lon}"
+    )
+
+
+def project_place(
+    place: dict[str, Any],
+    fields: Iterable[str] = DEFAULT_PLACE_FIELDS
+) -> dict[str, Any]:
+    projected = {}
+    for field in fields:
+        if field == "address":
+            projected["address"] = format_address(place["tags"])
+        elif field == "mapUrl":
+            projected["mapUrl"] = map_url(place["lat"], place["lon"])
+        elif field == "distance":
+            projected["distance"] = round(place["distance"])
+        elif field in place:
+            projected[field] = place[field]
+    return projected
@@ -0,0 +1,113 @@
+import heapq
+import re
+from typing import Any, Iterable
+
+import numpy as np
+
+from app.utils.geo import EARTH_RADIUS_M
+from app.utils.overpass import element_coords, element_id
+
+DISTANCE_WEIGHT = 1.0
+SERVICE_SHOP_TYPES = {"electronics", "repair", "appliance"}
+
+_SERVICE_PATTERN = re.compile(r"repair|service")
+
+
+def haversine_many(
+    lat: float,
+    lon: float,
+    lats: np.ndarray,
+    lons: np.ndarray
+) -> np.ndarray:
+    phi1 = np.radians(lat)
+    phi2 = np.radians(lats)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(lons - lon)
+    a = (
+        np.sin(d_phi / 2) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class ServiceCenterRanker:
+
+    def __init__(self, appliance_type: str, brand: str):
+        appliance = appliance_type.strip().lower()
+        brand = brand.strip().lower()
+        self._brand = re.compile(re.escape(brand)) if brand else None
+        self._appliance = re.compile(re.escape(appliance)) if appliance else None
+
+    def match_score(self, tags: dict[str, str]) -> float:
+        text_blob = " ".join(tags.values()).lower()
+        score = 0.0
+
+        if self._brand and self._brand.search(text_blob):
+            score += 3
+
+        if self._appliance and self._appliance.search(text_blob):
+            score += 2
+
+        if _SERVICE_PATTERN.search(text_blob):
+            score += 1
+
+        if tags.get("shop") in SERVICE_SHOP_TYPES:
+            score += 0.5
+
+        return score
+
+    def rank(
+        self,
+        elements: Iterable[dict[str, Any]],
+        user_lat: float,
+        user_lon: float,
+        radius_m: int,
+        top_k: int = 10,
+        min_score: float = 1.0
+    ) -> list[tuple[float, float, dict[str, Any]]]:
+        seen = set()
+        candidates = []
+        scores = []
+        lats = []
+        lons = []
+
+        for el in elements:
+            osm_id = element_id(el)
+            if osm_id in seen:
+                continue
+            seen.add(osm_id)
+
+            score = self.match_score(el.get("tags", {}))
+            if score < min_score:
+                continue
+
+            lat, lon = element_coords(el)
+            if not lat or not lon:
+                continue
+
+            candidates.append(el)
+            scores.append(score)
+            lats.append(lat)
+            lons.append(lon)
+
+        if not candidates:
+            return []
+
+        distances = haversine_many(
+            user_lat,
+            user_lon,
+            np.asarray(lats, dtype=np.float64),
+            np.asarray(lons, dtype=np.float64)
+        )
+        proximity = np.clip(1.0 - distances / max(radius_m, 1), 0.0, 1.0)
+        totals = np.asarray(scores) + DISTANCE_WEIGHT * proximity
+
+        best = heapq.nlargest(
+            top_k,
+            range(len(candidates)),
+            key=lambda index: (totals[index], -distances[index])
+        )
+        return [
+            (float(totals[index]), float(distances[index]), candidates[index])
+            for index in best
+        ]
@@ -1,24 +1,30 @@
-import os
+from app.llm import ROUTED_MODEL, llm_cache, llm_router
 
-import google.generativeai as genai
+EVENT_NOTES_PROMPT = """
+Write a concise, helpful plain-text reminder note for this calendar event.
 
-
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+Title: {title}
+Description: {description}
+"""
+# A few short notes, with about 1.5k tokens left over for thinking.
+EVENT_NOTES_MAX_OUTPUT_TOKENS = 2048
 
 
 def generate_event_notes(title: str, description: str | None) -> str:
-    prompt = f"""
-You are summarizing a calendar event for a reminder app.
-Write a concise, helpful note based on the event title and description.
-Return plain text only.
-
-Title: {title}
-Description: {description or "N/A"}
-"""
+    args = {"title": title, "description": description or "N/A"}
+    prompt = EVENT_NOTES_PROMPT.format(**args)
 
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return llm_cache.get_or_call_sync(
+            "event_notes",
+            ROUTED_MODEL,
+            EVENT_NOTES_PROMPT,
+            args,
+            lambda: llm_router.generate_sync(
+                "event_notes",
+                prompt,
+                max_output_tokens=EVENT_NOTES_MAX_OUTPUT_TOKENS
+            )
+        )
     except Exception:
         return description or ""
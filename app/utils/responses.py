@@ -0,0 +1,10 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
@@ -5,7 +5,7 @@ from app.controllers.gemini_service_interval_controller import (
 )
 
 
-def calculate_next_service_date_llm(
+async def calculate_next_service_date_llm(
     appliance_type: str,
     base_date: date,
     brand: str | None = None,
@@ -13,7 +13,7 @@ def calculate_next_service_date_llm(
 ) -> dict:
 
 
-    interval_data = GeminiServiceIntervalController.get_service_interval_months(
+    interval_data = await GeminiServiceIntervalController.get_service_interval_months(
         appliance_type=appliance_type,
         brand=brand,
         model=model
@@ -29,3 +29,28 @@ def calculate_next_service_date_llm(
         "reason": reason,
         "nextServiceDate": next_date
     }
+
+
+async def calculate_next_service_dates_llm(
+    appliances: list[dict]
+) -> list[dict | None]:
+    intervals = await GeminiServiceIntervalController.get_service_intervals([
+        (item["appliance_type"], item.get("brand"), item.get("model"))
+        for item in appliances
+    ])
+
+    results = []
+    for item, interval_data in zip(appliances, intervals):
+        if not interval_data:
+            results.append(None)
+            continue
+
+        interval_months = interval_data["intervalMonths"]
+        results.append({
+            "intervalMonths": interval_months,
+            "reason": interval_data["reason"],
+            "nextServiceDate": (
+                item["base_date"] + relativedelta(months=interval_months)
+            )
+        })
+    return results
@@ -0,0 +1,169 @@
+import threading
+import time
+
+from app.db import SessionLocal
+from app.models.service_interval_orm import ServiceIntervalORM
+from app.utils.appliances import normalize_appliance
+
+IntervalKey = tuple[str, str, str]
+
+# Manufacturer-typical intervals; brand/model rows override the type row.
+BUILTIN_INTERVALS: dict[IntervalKey, tuple[int, str]] = {
+    ("air conditioner", "", ""): (
+        6, "Clean filters and check coolant before and after peak season"
+    ),
+    ("refrigerator", "", ""): (
+        12, "Yearly coil cleaning, gasket and thermostat check"
+    ),
+    ("washing machine", "", ""): (
+        6, "Drum, filter and hose check every six months"
+    ),
+    ("television", "", ""): (
+        24, "Solid-state electronics need little routine service"
+    ),
+    ("microwave", "", ""): (
+        12, "Yearly door seal, magnetron and safety interlock check"
+    ),
+    ("dishwasher", "", ""): (
+        6, "Filter, spray arm and seal check every six months"
+    ),
+    ("water purifier", "", ""): (
+        3, "Sediment and carbon filters clog within about three months"
+    ),
+    ("water heater", "", ""): (
+        12, "Yearly descaling and anode rod inspection"
+    ),
+    ("chimney", "", ""): (
+        3, "Grease filters need cleaning every few months"
+    ),
+    ("air purifier", "", ""): (
+        6, "HEPA and pre-filters degrade within about six months"
+    ),
+    ("ceiling fan", "", ""): (
+        12, "Yearly bearing lubrication and blade balancing"
+    ),
+    ("inverter", "", ""): (
+        6, "Battery water level and terminal check every six months"
+    ),
+    ("vacuum cleaner", "", ""): (
+        6, "Filter and brush roll cleaning every six months"
+    ),
+    ("motorcycle", "", ""): (
+        4, "Oil change and general service roughly every 3000 km"
+    ),
+    ("car", "", ""): (
+        12, "Annual service or every 10000 km, whichever is first"
+    ),
+    ("water purifier", "kent", ""): (
+        6, "Kent recommends RO membrane and filter service twice a year"
+    ),
+    ("water purifier", "aquaguard", ""): (
+        4, "Aquaguard schedules filter service every four months"
+    ),
+    ("washing machine", "ifb", ""): (
+        4, "IFB front loaders need more frequent descaling in hard water"
+    ),
+}
+
+
+def interval_key(
+    appliance_type: str,
+    brand: str | None = None,
+    model: str | None = None
+) -> IntervalKey:
+    return (
+        normalize_appliance(appliance_type),
+        " ".join((brand or "").lower().split()),
+        " ".join((model or "").lower().split())
+    )
+
+
+class ServiceIntervalTable:
+
+    def __init__(self):
+        self._intervals: dict[IntervalKey, tuple[int, str]] = dict(
+            BUILTIN_INTERVALS
+        )
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            db = SessionLocal()
+            try:
+                for record in db.query(ServiceIntervalORM).all():
+                    self._intervals[
+                        (record.appliance_type, record.brand, record.model)
+                    ] = (record.interval_months, record.reason)
+            finally:
+                db.close()
+            self._loaded = True
+
+    def lookup(
+        self,
+        appliance_type: str,
+        brand: str | None = None,
+        model: str | None = None
+    ) -> dict | None:
+        self.load()
+        appliance_type, brand, model = interval_key(
+            appliance_type, brand, model
+        )
+        # Most specific match wins: model, then brand, then the type itself.
+        for key in (
+            (appliance_type, brand, model),
+            (appliance_type, brand, ""),
+            (appliance_type, "", "")
+        ):
+            entry = self._intervals.get(key)
+            if entry:
+                return {"intervalMonths": entry[0], "reason": entry[1]}
+        return None
+
+    def _write(self, key: IntervalKey, months: int, reason: str, source: str):
+        db = SessionLocal()
+        try:
+            record = (
+                db.query(ServiceIntervalORM)
+                .filter_by(appliance_type=key[0], brand=key[1], model=key[2])
+                .first()
+            )
+            if not record:
+                record = ServiceIntervalORM(
+                    appliance_type=key[0], brand=key[1], model=key[2]
+                )
+                db.add(record)
+            record.interval_months = months
+            record.reason = reason
+            record.source = source
+            record.updated_at = time.time()
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._intervals[key] = (months, reason)
+
+    def store(
+        self,
+        appliance_type: str,
+        brand: str | None,
+        model: str | None,
+        interval: dict,
+        source: str = "llm"
+    ):
+        self.load()
+        key = interval_key(appliance_type, brand, model)
+        months = int(interval["intervalMonths"])
+        reason = interval["reason"]
+
+        self._write(key, months, reason, source)
+        # An unknown type also gets a type-level row, so other brands and
+        # models of it are answered without the LLM too.
+        if (key[0], "", "") not in self._intervals:
+            self._write((key[0], "", ""), months, reason, source)
+
+
+service_interval_table = ServiceIntervalTable()
@@ -0,0 +1,33 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the error as retrieved even if every waiter went away.
+            future.exception()
+
+    async def do(
+        self,
+        key: Hashable,
+        call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(
+                lambda done: self._forget(key, done)
+            )
+        # Shield so one cancelled waiter does not cancel the shared call.
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)